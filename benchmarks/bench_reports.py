@@ -0,0 +1,48 @@
+"""
+Times the PDF reports on a synthetic season.
+
+    python benchmarks/bench_reports.py [orders]
+
+The orders report for 20,000 orders should take a few seconds at most.
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import reports  # noqa: E402
+from backend import Backend  # noqa: E402
+from season import generate_season  # noqa: E402
+
+
+def matched_season(rows, seed=0):
+    # A season after auto matching, so every report has rows to show
+    backend = Backend()
+    turkeys, orders = generate_season(rows, seed=seed)
+    backend.add_turkeys(turkeys)
+    backend.add_orders(orders)
+    backend.auto_match("min_total")
+    return backend.orders, backend.turkeys
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    orders, turkeys = matched_season(rows)
+    with tempfile.TemporaryDirectory() as directory:
+        for render, table in [
+            (reports.turkey_orders_pdf, orders),
+            (reports.ham_orders_pdf, orders),
+            (reports.free_turkeys_pdf, turkeys),
+        ]:
+            filename = os.path.join(directory, f"{render.__name__}.pdf")
+            start = time.perf_counter()
+            render(table, filename)
+            seconds = time.perf_counter() - start
+            size = os.path.getsize(filename) / 1e6 if os.path.exists(filename) else 0
+            print(f"{render.__name__:<20} {rows:>7} rows  {seconds:6.2f} s  {size:5.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
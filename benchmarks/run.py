@@ -0,0 +1,209 @@
+"""
+Times the backend and the UI refresh path on synthetic seasons.
+
+    python benchmarks/run.py [--sizes 1000 10000 100000] [--out results.json] [--compare old.json]
+
+Every size starts from the same seeded season, so runs from different versions
+of the code can be compared operation by operation.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from backend import Backend  # noqa: E402
+from season import generate_season  # noqa: E402
+from tables import ROWS_PER_PAGE, build_row, order_cells, turkey_cells  # noqa: E402
+from turkey_manager import TurkeyManager  # noqa: E402
+
+SIZES = [1_000, 10_000, 100_000]
+# Single match / remove calls timed per size
+SAMPLE = 1_000
+# New rows between a cached sort and the timed incremental update
+INCREMENTAL = 10
+
+
+class Suite:
+    def __init__(self, size):
+        self.size = size
+        self.results = {}
+
+    def time(self, name, fn, ops=1):
+        start = time.perf_counter()
+        fn()
+        seconds = time.perf_counter() - start
+        self.results[name] = {"seconds": round(seconds, 6), "ops": ops}
+        per_op = f"{seconds / ops * 1e6:10.1f} us/op" if ops > 1 else ""
+        print(f"  {name:<40} {seconds:9.3f} s {per_op}")
+
+
+def loaded_backend(turkeys, orders):
+    backend = Backend()
+    backend.add_turkeys(turkeys)
+    backend.add_orders(orders)
+    return backend
+
+
+def build_page(table, ids, cells):
+    records = table.loc[ids[:ROWS_PER_PAGE]].to_dict("index")
+    return [build_row(key, cells(key, records[key]), False, lambda key: None) for key in records]
+
+
+def run_size(size, seed):
+    print(f"{size} turkeys / {size} orders")
+    suite = Suite(size)
+    turkeys, orders = generate_season(size, seed=seed)
+    sample = min(SAMPLE, size // 10)
+
+    # --- Adding one at a time, as at the scale and the order desk ---
+    backend = Backend()
+
+    def add_turkeys():
+        for tid, weight in turkeys:
+            backend.add_turkey(tid, weight)
+
+    def add_orders():
+        for order in orders:
+            backend.add_order(*order)
+
+    suite.time("add_turkey", add_turkeys, len(turkeys))
+    suite.time("add_order", add_orders, len(orders))
+
+    # --- Refresh path: sorted ids, then one page of rows per table ---
+    manager = TurkeyManager(backend, lambda: None)
+    suite.time("sorted_turkey_ids (cold)", lambda: manager.sorted_turkey_ids("weight", True))
+    suite.time("sorted_order_ids (cold)", lambda: manager.sorted_order_ids("name", True))
+    # The default sorts, by tid/oid, read the index instead of a column
+    suite.time("sorted_turkey_ids by tid (cold)", lambda: manager.sorted_turkey_ids("tid", True))
+    suite.time("sorted_order_ids by oid (cold)", lambda: manager.sorted_order_ids("oid", True))
+    suite.time("get_sorted_turkeys", lambda: manager.get_sorted_turkeys("weight", True))
+    suite.time("get_sorted_orders", lambda: manager.get_sorted_orders("name", True))
+    suite.time("build turkey page", lambda: build_page(
+        backend.turkeys, manager.sorted_turkey_ids("weight", True), turkey_cells))
+    suite.time("build order page", lambda: build_page(
+        backend.orders, manager.sorted_order_ids("name", True), order_cells))
+
+    # --- Customer lookup: index build, then one search per keystroke burst ---
+    queries = ["smi", "ann", "pickup tue", "a", str(orders[len(orders) // 2][0])]
+    suite.time("search_orders (cold)", lambda: backend.search_orders(queries[0]))
+    suite.time("search_orders", lambda: [backend.search_orders(query) for query in queries], len(queries))
+
+    # --- Single matches and removals ---
+    targets = {oid: target for oid, target, *_ in orders}
+    oids = [oid for oid, target in targets.items() if target > 0][:sample]
+    tids = [tid for tid, _ in turkeys[:sample]]
+    pairs = list(zip(oids, tids))
+
+    def match():
+        for oid, tid in pairs:
+            backend.match(oid, tid)
+
+    suite.time("match", match, len(pairs))
+    # Catch the views up with the batch above, then make a few edits so the
+    # timings below take the incremental path rather than a re-sort
+    views = [
+        lambda: manager.sorted_turkey_ids("weight", True),
+        lambda: manager.sorted_order_ids("name", True),
+        lambda: manager.sorted_turkey_ids("tid", True),
+        lambda: manager.sorted_order_ids("oid", True),
+    ]
+    for view in views:
+        view()
+    late = max(tid for tid, _ in turkeys) + 1
+    backend.add_turkeys([(late + i, turkeys[i][1]) for i in range(INCREMENTAL)])
+    late = max(targets) + 1
+    backend.add_orders([(late + i, *orders[i][1:]) for i in range(INCREMENTAL)])
+    suite.time("sorted_turkey_ids (incremental)", lambda: manager.sorted_turkey_ids("weight", True))
+    suite.time("sorted_order_ids (incremental)", lambda: manager.sorted_order_ids("name", True))
+    suite.time("sorted_turkey_ids by tid (incremental)", lambda: manager.sorted_turkey_ids("tid", True))
+    suite.time("sorted_order_ids by oid (incremental)", lambda: manager.sorted_order_ids("oid", True))
+    suite.time("search_orders (incremental)", lambda: backend.search_orders(queries[0]))
+    suite.time("dashboard", lambda: backend.dashboard())
+    suite.time("remove_match_by_oid", lambda: [backend.remove_match_by_oid(oid) for oid in oids], len(oids))
+    match()
+    suite.time("remove_match_by_tid", lambda: [backend.remove_match_by_tid(tid) for tid in tids], len(tids))
+    suite.time("remove_order", lambda: [backend.remove_order(oid) for oid in oids], len(oids))
+    suite.time("remove_turkey", lambda: [backend.remove_turkey(tid) for tid in tids], len(tids))
+
+    # --- Live weigh-in: orders taken, birds arriving one by one ---
+    backend = loaded_backend([], orders)
+    backend.set_live_mode(True, swaps=True)
+    arrivals = turkeys[:sample]
+    suite.time("add_turkey (live, swaps)", lambda: [backend.add_turkey(tid, weight) for tid, weight in arrivals], len(arrivals))
+
+    # --- auto_match, each strategy from the same unmatched season ---
+    matched = None
+    for strategy in ("min_total", "min_max", "constrained", "greedy"):
+        name = f"auto_match ({strategy})"
+        backend = loaded_backend(turkeys, orders)
+        suite.time(name, lambda: backend.auto_match(strategy))
+        matched = matched or backend
+
+    # --- PDF exports of a matched season ---
+    with tempfile.TemporaryDirectory() as directory:
+        for name, export in [
+            ("export_turkey_orders_pdf", matched.export_turkey_orders_pdf),
+            ("export_ham_orders_without_turkey", matched.export_ham_orders_without_turkey),
+            ("export_free_turkeys_pdf", matched.export_free_turkeys_pdf),
+            ("export_pickup_tickets", matched.export_pickup_tickets),
+        ]:
+            suite.time(name, lambda: export(os.path.join(directory, f"{name}.pdf")))
+    return suite.results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline):
+    print(f"\nCompared with {baseline['commit'] or 'baseline'} ({baseline['created']}):")
+    for size, timings in results.items():
+        for name, now in timings.items():
+            then = baseline["results"].get(size, {}).get(name)
+            if "seconds" in now and then and "seconds" in then and then["seconds"] > 0:
+                ratio = now["seconds"] / then["seconds"]
+                flag = "  <-- slower" if ratio > 1.2 else ""
+                print(f"  {size:>7} {name:<40} {then['seconds']:9.3f} s -> {now['seconds']:9.3f} s  x{ratio:5.2f}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="benchmark-results.json")
+    parser.add_argument("--compare", help="an earlier results file to compare against")
+    args = parser.parse_args()
+
+    results = {str(size): run_size(size, args.seed) for size in args.sizes}
+    report = {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "results": results,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved as '{args.out}'")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
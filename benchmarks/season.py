@@ -0,0 +1,54 @@
+"""
+Seeded synthetic seasons for the benchmarks.
+
+A season looks like a real one: turkey weights are roughly normal around 16
+lbs, customers ask for whole-pound targets near the same mean, some orders are
+ham-only (target 0), and a few have notes.
+"""
+import numpy as np
+
+FIRST_NAMES = [
+    "Anne", "Bob", "Carla", "Dmitri", "Elena", "Farid", "Grace", "Hiro", "Ines", "Jamal",
+    "Kate", "Luis", "Mei", "Nora", "Omar", "Priya", "Quinn", "Rosa", "Sam", "Tariq",
+]
+LAST_NAMES = [
+    "Anders", "Brooks", "Chen", "Diaz", "Evans", "Fischer", "Garcia", "Hughes", "Ivanova", "Jones",
+    "Kowalski", "Lopez", "Miller", "Nguyen", "Okafor", "Patel", "Quinn", "Rossi", "Smith", "Tanaka",
+]
+NOTES = ["pickup Tuesday", "call on arrival", "brined", "needs a box", "paid in full", "same as last year"]
+
+HAMS = ["None", "Whole", "1/2", "1/4"]
+HAM_SHARES = [0.6, 0.15, 0.15, 0.1]
+HAM_ONLY_SHARE = 0.05    # orders with no turkey, only ham
+NOTES_SHARE = 0.3
+
+
+def generate_season(turkeys, orders=None, seed=0):
+    """
+    Makes a season of `turkeys` birds and `orders` orders (as many as turkeys by default).
+
+    Returns:
+        (turkeys, orders): (tid, weight) and (oid, target_weight, name, ham, notes)
+        tuples, ready for Backend.add_turkeys / add_orders.
+    """
+    orders = turkeys if orders is None else orders
+    rng = np.random.default_rng(seed)
+
+    weights = np.clip(rng.normal(16, 3.5, turkeys), 8, 30).round(1)
+    turkey_rows = list(zip(range(1, turkeys + 1), weights.tolist()))
+
+    targets = np.clip(rng.normal(16, 3, orders), 10, 26).round()
+    hams = rng.choice(HAMS, orders, p=HAM_SHARES)
+    ham_only = rng.random(orders) < HAM_ONLY_SHARE
+    targets[ham_only] = 0
+    hams[ham_only & (hams == "None")] = "Whole"
+    first = rng.choice(FIRST_NAMES, orders)
+    last = rng.choice(LAST_NAMES, orders)
+    notes = np.where(rng.random(orders) < NOTES_SHARE, rng.choice(NOTES, orders), "")
+    order_rows = [
+        (oid, target, f"{first_name} {last_name}", ham, note)
+        for oid, target, first_name, last_name, ham, note in zip(
+            range(1, orders + 1), targets.tolist(), first.tolist(), last.tolist(), hams.tolist(), notes.tolist()
+        )
+    ]
+    return turkey_rows, order_rows
@@ -0,0 +1,99 @@
+"""
+Checks the app's cold start against its budget and shows where import time goes.
+
+    python benchmarks/startup.py [--runs 5] [--top 15]
+
+Everything imported before main() can draw its first frame must stay under
+main.FIRST_FRAME_BUDGET, and must not pull in the heavy modules (pandas, numpy,
+fpdf, pypdf), which load behind the loading indicator instead. Exits with
+status 1 when either check fails.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+# Must not be loaded before the first frame
+HEAVY = ["pandas", "numpy", "fpdf", "pypdf"]
+# Loaded after the first frame
+DEFERRED = "import backend, tables, turkey_manager"
+
+_PROBE = """
+import sys, time
+start = time.perf_counter()
+import main
+first_frame = time.perf_counter() - start
+early = [name for name in {heavy!r} if name in sys.modules]
+{deferred}
+rest = time.perf_counter() - start - first_frame
+print(first_frame, rest, main.FIRST_FRAME_BUDGET)
+print(" ".join(early))
+"""
+
+
+def probe(deferred=""):
+    # A fresh interpreter per run: a cold import is the whole point
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(deferred=deferred, heavy=HEAVY)],
+        cwd=SRC, capture_output=True, text=True, check=True,
+    ).stdout.splitlines()
+    first_frame, rest, budget = map(float, out[0].split())
+    loaded = out[1].split() if len(out) > 1 else []
+    return first_frame, rest, budget, loaded
+
+
+def import_profile(statement, top):
+    """
+    Returns:
+        list: (cumulative seconds, self seconds, module) of the slowest
+        top-level packages and app modules, slowest first.
+    """
+    err = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=SRC, capture_output=True, text=True, check=True,
+    ).stderr
+    rows = []
+    for line in err.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        # The statement's own imports and theirs, not the internals of each package
+        if not name.startswith("    "):
+            rows.append((int(cumulative) / 1e6, int(own) / 1e6, name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    runs = [probe(DEFERRED) for _ in range(args.runs)]
+    first_frame = statistics.median(run[0] for run in runs)
+    rest = statistics.median(run[1] for run in runs)
+    budget = runs[0][2]
+    early = sorted({name for run in runs for name in run[3]})
+
+    print(f"Before the first frame: {first_frame:.3f} s (budget {budget:.2f} s)")
+    print(f"Behind the loading indicator: {rest:.3f} s")
+    for label, statement in [("first frame", "import main"), ("deferred", f"import main; {DEFERRED}")]:
+        print(f"\nSlowest imports ({label}):")
+        for cumulative, own, name in import_profile(statement, args.top):
+            print(f"  {name:<28} {cumulative:7.3f} s  (self {own:.3f} s)")
+
+    ok = True
+    if first_frame > budget:
+        print(f"\nOver budget by {first_frame - budget:.3f} s")
+        ok = False
+    if early:
+        print(f"\nLoaded before the first frame: {', '.join(early)}")
+        ok = False
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,332 +1,1130 @@
+import functools
+import logging
+import threading
+from collections import Counter, deque
+
+import numpy as np
 import pandas as pd
-from fpdf import FPDF
+
+import reports
+import tickets
+from importer import (
+    ORDER_COLUMNS, TURKEY_COLUMNS, ImportReport, parse_orders, parse_turkeys, read_chunks, sniff_kind
+)
+from history import History, Session, undoable
+from journal import Journal
+from matching import DEFAULT_TOLERANCE, STRATEGIES, constrained_pairs, default_priority, match_score, optimal_pairs
+from metrics import log, metrics, profiled
+from search_index import SearchIndex
+from snapshot import load_budget, load_tables, save_tables
+from table_buffer import BufferedTable
+from weight_index import WeightIndex
+
+# How many (version, table, id) changes are remembered for incremental readers
+CHANGE_LOG_SIZE = 10_000
+# Closest waiting / matched orders live mode looks at for each new turkey
+LIVE_CANDIDATES = 8
+# Per-order matching constraints (see constrain_order); None means "not set"
+CONSTRAINT_COLUMNS = ["min_weight", "max_weight", "priority"]
+NO_CONSTRAINTS = (None, None, None)
+
+def synchronized(fn):
+    # Runs a Backend method under its lock; in web mode every session shares one backend
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return fn(self, *args, **kwargs)
+
+    return wrapper
+
 
 class Backend:
 
     def __init__(self,csv=0):
+        # Reentrant, since e.g. auto_match calls match_many and remove_order calls remove_match_by_oid
+        self.lock = threading.RLock()
+        #create empty turkeys table; new rows wait in a buffer until the table is next read in full.
+        # The dtypes are those the table always had once it held rows: tids and
+        # weights of unmatched orders are missing, so those columns are object.
+        self._orders = BufferedTable(pd.DataFrame({
+            "oid": pd.Series(dtype="int"),
+            "name": pd.Series(dtype="object"),
+            "assigned_tid": pd.Series(dtype="object"),
+            "assigned_weight": pd.Series(dtype="object"),
+            "target_weight": pd.Series(dtype="float"),
+            "ham": pd.Series(dtype="object"),
+            "notes": pd.Series(dtype="object"),
+        }).set_index("oid"))
+        # create empty orders
+        self._turkeys = BufferedTable(pd.DataFrame({
+            "tid": pd.Series(dtype="int"),
+            "weight": pd.Series(dtype="float"),
+            "assigned": pd.Series(dtype="bool")
+        }).set_index("tid"))
+        # free turkeys sorted by weight, for nearest-weight lookups
+        self._free_turkeys = WeightIndex()
+        # current assignments in both directions
+        self._tid_by_oid = {}
+        self._oid_by_tid = {}
+        # orders with a target weight, by target, split by whether they have a turkey
+        self._waiting_orders = WeightIndex()
+        self._matched_orders = WeightIndex()
+        # oid -> (min_weight, max_weight, priority), for orders with any of them set
+        self._constraints = {}
+        # orders per ham option, kept running for the dashboard
+        self._ham_counts = Counter()
+        # live weigh-in: add_turkey offers each new bird to a waiting order
+        self.live_match = False
+        self.live_swaps = False
+        self.live_tolerance = DEFAULT_TOLERANCE
+        # bumped on every mutation; the log tells readers which rows changed
+        self.version = 0
+        self._changes = deque(maxlen=CHANGE_LOG_SIZE)
+        # mutations are journaled when the backend is persistent
+        self._journal = None
+        # what each report file was last rendered from
+        self._report_cache = reports.ReportCache()
+        # commands that can be undone and redone
+        self._history = History()
+        # customer lookup by oid, name and notes; caught up lazily on search
+        self._search = SearchIndex()
+
         if csv:
-            #future for csv save
+            # csv is the directory holding the journal and its snapshots
+            journal = Journal(csv)
+            # Replaying the journal is not something to undo
+            with self._history.replaying():
+                try:
+                    journal.restore(self)
+                except Exception:
+                    # Let go of the directory, so it can be opened once fixed
+                    journal.close()
+                    raise
+            self._journal = journal
+
+    def _tables(self):
+        # Everything a snapshot holds, by table name
+        constraints = pd.DataFrame(
+            [(oid, *values) for oid, values in self._constraints.items()], columns=["oid", *CONSTRAINT_COLUMNS]
+        ).set_index("oid")
+        return {"orders": self.orders, "turkeys": self.turkeys, "constraints": constraints}
+
+    def _load_tables(self, tables):
+        # Replace the tables wholesale and rebuild everything derived from them
+        orders, turkeys = tables["orders"], tables["turkeys"]
+        # Snapshots from before matching constraints have no constraints table
+        constraints = tables.get("constraints")
+        self._constraints = {} if constraints is None else {
+            oid: tuple(None if pd.isna(value) else value for value in values)
+            for oid, *values in constraints.itertuples()
+        }
+        self._orders = BufferedTable(orders)
+        self._turkeys = BufferedTable(turkeys)
+        self._free_turkeys = WeightIndex()
+        self._free_turkeys.add_many(turkeys.loc[~turkeys["assigned"], "weight"].items())
+        assigned = orders["assigned_tid"].dropna()
+        self._tid_by_oid = dict(assigned.items())
+        self._oid_by_tid = {tid: oid for oid, tid in self._tid_by_oid.items()}
+        has_target = orders["target_weight"] != 0
+        matched = orders["assigned_tid"].notna()
+        self._waiting_orders = WeightIndex()
+        self._waiting_orders.add_many(orders.loc[has_target & ~matched, "target_weight"].items())
+        self._matched_orders = WeightIndex()
+        self._matched_orders.add_many(orders.loc[has_target & matched, "target_weight"].items())
+        self._ham_counts = Counter(orders["ham"].tolist())
+        # Everything changed: readers must start over
+        self.version += 1
+        self._changes.clear()
+        self._history.clear()
+
+    @profiled
+    @synchronized
+    def save_snapshot(self, path):
+        """
+        Saves the orders and turkeys tables as a binary columnar snapshot.
+
+        Args:
+            path (str): the snapshot directory (replaced if it exists).
+        """
+        save_tables(path, self._tables())
+        log.info("Snapshot saved to '%s'", path)
+
+    @profiled
+    @synchronized
+    def load_snapshot(self, path):
+        """
+        Replaces all data with a snapshot written by save_snapshot.
+
+        Numeric columns are memory-mapped, so even a full season loads quickly;
+        the load time is checked against the snapshot load budget.
+
+        Args:
+            path (str): the snapshot directory.
+
+        Returns:
+            float: seconds the load took.
+        """
+        tables, seconds = load_tables(path, ["orders", "turkeys", "constraints"])
+        self._load_tables(tables)
+        rows = len(self._orders) + len(self._turkeys)
+        if seconds > load_budget(rows):
+            log.warning("Loading %d rows took %.3fs, over the %.3fs budget", rows, seconds, load_budget(rows))
+        # The journal has to restart from the loaded state
+        if self._journal is not None:
+            self._journal.compact(self)
+        return seconds
+
+    def _changed(self, table, keys):
+        # Record a mutation of rows `keys` in "orders" or "turkeys"
+        self.version += 1
+        self._changes.extend((self.version, table, key) for key in keys)
+
+    @synchronized
+    def changes_since(self, version):
+        """
+        Lists the rows changed after `version`, for readers that cache views.
+
+        Args:
+            version (int): a value of Backend.version seen earlier.
+
+        Returns:
+            list: (table, id) pairs, possibly repeated, or None if the change
+            log no longer reaches back to `version`.
+        """
+        if version == self.version:
+            return []
+        if not self._changes or self._changes[0][0] > version:
+            return None
+        changes = []
+        for changed_version, table, key in reversed(self._changes):
+            if changed_version <= version:
+                break
+            changes.append((table, key))
+        return changes
+
+    def _log(self, *records):
+        # One journal row per (op, *args) record, compacting when the journal is long
+        if self._journal is None:
             return
-        else:
-            #create empty turkeys table
-            self.orders = pd.DataFrame({
-                "oid": pd.Series(dtype="int"),
-                "name": pd.Series(dtype="string"),
-                "assigned_tid": pd.Series(dtype="int"),
-                "assigned_weight": pd.Series(dtype="float"),
-                "target_weight": pd.Series(dtype="float"),
-                "ham": pd.Series(dtype="string"),
-                "notes": pd.Series(dtype="string"),
-            }).set_index("oid")
-            # create empty orders
-            self.turkeys = pd.DataFrame({
-                "tid": pd.Series(dtype="int"),
-                "weight": pd.Series(dtype="float"),
-                "assigned": pd.Series(dtype="bool")
-            }).set_index("tid")
+        self._journal.append_many(records)
+        if self._journal.needs_compaction():
+            self._journal.compact(self)
+
+    @property
+    def orders(self):
+        with self.lock:
+            return self._orders.frame
+
+    @property
+    def turkeys(self):
+        with self.lock:
+            return self._turkeys.frame
+
+    def table(self, name):
+        """
+        The live "orders" or "turkeys" table, for readers that only need a
+        few rows (see BufferedTable.rows): unlike the orders and turkeys
+        properties, reading it does not flush the rows added since.
+        """
+        return self._orders if name == "orders" else self._turkeys
+
+    def copy_tables(self):
+        """
+        Consistent copies of (orders, turkeys), for work done outside the lock.
+        """
+        with self.lock:
+            return self.orders.copy(), self.turkeys.copy()
+
+    def _order_exists(self, oid):
+        return oid in self._orders
 
+    def _turkey_exists(self, tid):
+        return tid in self._turkeys
+
+    @profiled
+    @synchronized
+    @undoable("Add order")
     def add_order(self, oid, target_weight, name, ham, notes):
-        if oid in self.orders.index:
+        if self._order_exists(oid):
             raise ValueError(f"Order with oid={oid} already exists!")
-        new_order = {
+        self._orders.append(oid, self._new_order(target_weight, name, ham, notes))
+        if target_weight:
+            self._waiting_orders.add(oid, target_weight)
+        self._ham_counts[ham] += 1
+        self._changed("orders", [oid])
+        self._log(("add_order", oid, target_weight, name, ham, notes))
+        self._history.record([("add_order", oid, target_weight, name, ham, notes)], [("remove_order", oid)])
+
+    @profiled
+    @synchronized
+    @undoable("Add orders")
+    def add_orders(self, orders):
+        """
+        Adds many orders at once, all or nothing.
+
+        Args:
+            orders: iterable of (oid, target_weight, name, ham, notes).
+
+        Returns:
+            int: the number of orders added.
+        """
+        orders = list(orders)
+        self._check_new_ids([order[0] for order in orders], self._order_exists, "Order", "oid")
+        for oid, target_weight, name, ham, notes in orders:
+            self._orders.append(oid, self._new_order(target_weight, name, ham, notes))
+        self._waiting_orders.add_many((order[0], order[1]) for order in orders if order[1])
+        self._ham_counts.update(order[3] for order in orders)
+        self._changed("orders", [order[0] for order in orders])
+        self._log(*(("add_order", *order) for order in orders))
+        self._history.record([("add_orders", orders)], [("remove_orders", [order[0] for order in orders])])
+        return len(orders)
+
+    @staticmethod
+    def _new_order(target_weight, name, ham, notes):
+        return {
             "target_weight": target_weight,
             "name": name,
             "ham": ham,
             "notes": notes,
-            "assigned_tid": pd.NA,
-            "assigned_weight": pd.NA
+            # NaN, as new rows always read; an undone match leaves pd.NA
+            "assigned_tid": np.nan,
+            "assigned_weight": np.nan
         }
 
-        self.orders.loc[oid] = new_order
-
+    @profiled
+    @synchronized
+    @undoable("Add turkey")
     def add_turkey(self,tid,weight):
-        if tid in self.turkeys.index:
+        """
+        Adds one turkey. In live mode (see set_live_mode) it is matched right
+        away; undoing the add undoes that match too.
+
+        Returns:
+            the oid the turkey was matched to in live mode, else None.
+        """
+        if self._turkey_exists(tid):
             raise ValueError(f"turkey with tid={tid} already exists!")
         new_turkey = {
             "weight": weight,
             "assigned": False
         }
-        self.turkeys.loc[tid] = new_turkey
+        self._turkeys.append(tid, new_turkey)
+        self._free_turkeys.add(tid, weight)
+        self._changed("turkeys", [tid])
+        self._log(("add_turkey", tid, weight))
+        self._history.record([("add_turkey", tid, weight)], [("remove_turkey", tid)])
+        # A replayed add is followed by its recorded matches instead
+        if self.live_match and not self._history.is_replaying():
+            return self._offer(tid, float(weight))
+        return None
+
+    @synchronized
+    def set_live_mode(self, enabled, swaps=False, tolerance=DEFAULT_TOLERANCE):
+        """
+        Live weigh-in: every turkey added with add_turkey goes straight to the
+        waiting order whose target it is closest to, if it fits that order's
+        range (target weight ± tolerance without one). Finding the order is a
+        lookup in the index of waiting targets, O(log n) per bird.
+
+        Args:
+            enabled (bool): turn live matching on or off.
+            swaps (bool): also consider giving the bird to a matched order it
+                fits better and passing that order's turkey on to a waiting
+                order, whenever that lowers the total deviation.
+            tolerance (float): acceptable deviation for orders without a range.
+        """
+        self.live_match = enabled
+        self.live_swaps = swaps
+        self.live_tolerance = tolerance
+        log.info("Live weigh-in %s%s", "on" if enabled else "off", " with swaps" if enabled and swaps else "")
+
+    def _fits(self, oid, weight):
+        # Whether a turkey weight is acceptable for an order in live mode
+        low, high, _ = self._constraints.get(oid, NO_CONSTRAINTS)
+        if low is None and high is None:
+            return abs(weight - self._orders.get(oid, "target_weight")) <= self.live_tolerance
+        return (low is None or weight >= low) and (high is None or weight <= high)
+
+    def _waiting_for(self, weight):
+        # The closest waiting order a turkey weight fits: (oid, deviation) or None
+        for oid, target in self._waiting_orders.nearest(weight, LIVE_CANDIDATES):
+            if self._fits(oid, weight):
+                return oid, abs(weight - target)
+        return None
+
+    def _offer(self, tid, weight):
+        # Options as (orders newly matched, change in total deviation, plan)
+        options = []
+        direct = self._waiting_for(weight)
+        if direct is not None:
+            options.append((1, direct[1], direct[0], None))
+        if self.live_swaps:
+            for oid, target in self._matched_orders.nearest(weight, LIVE_CANDIDATES):
+                old_tid = self._tid_by_oid[oid]
+                old_weight = float(self._turkeys.get(old_tid, "weight"))
+                gain = abs(weight - target) - abs(old_weight - target)
+                if gain >= 0 or not self._fits(oid, weight):
+                    continue
+                taker = self._waiting_for(old_weight)
+                if taker is None:
+                    options.append((0, gain, oid, None))
+                else:
+                    options.append((1, gain + taker[1], oid, (taker[0], old_tid)))
+        if not options:
+            return None
+
+        # More orders filled first, then the smaller deviation
+        _, _, oid, passed_on = min(options, key=lambda option: (-option[0], option[1]))
+        if oid in self._tid_by_oid:
+            # Swap: the bird replaces this order's turkey, which moves on
+            self.remove_match_by_oid(oid)
+            metrics.count("live swaps")
+        self.match(oid, tid)
+        if passed_on is not None:
+            self.match(*passed_on)
+        metrics.count("live matches")
+        return oid
+
+    @profiled
+    @synchronized
+    @undoable("Add turkeys")
+    def add_turkeys(self, turkeys):
+        """
+        Adds many turkeys at once, all or nothing.
+
+        Args:
+            turkeys: iterable of (tid, weight).
+
+        Returns:
+            int: the number of turkeys added.
+        """
+        turkeys = list(turkeys)
+        self._check_new_ids([tid for tid, _ in turkeys], self._turkey_exists, "turkey", "tid")
+        for tid, weight in turkeys:
+            self._turkeys.append(tid, {"weight": weight, "assigned": False})
+        self._free_turkeys.add_many(turkeys)
+        self._changed("turkeys", [tid for tid, _ in turkeys])
+        self._log(*(("add_turkey", tid, weight) for tid, weight in turkeys))
+        self._history.record([("add_turkeys", turkeys)], [("remove_turkeys", [tid for tid, _ in turkeys])])
+        return len(turkeys)
+
+    @staticmethod
+    def _move_orders(oids, src, dst):
+        # Moves orders between the waiting and matched target indexes
+        items = [(oid, src.weight(oid)) for oid in oids if oid in src]
+        src.remove_many([oid for oid, _ in items])
+        dst.add_many(items)
+
+    @staticmethod
+    def _check_new_ids(ids, exists, label, id_name):
+        if len(set(ids)) != len(ids):
+            raise ValueError(f"A {id_name} appears more than once in the new {label.lower()}s!")
+        existing = [key for key in ids if exists(key)]
+        if existing:
+            raise ValueError(f"{label} with {id_name}={existing} already exists!")
+
+    @profiled
+    @undoable("Import CSV")
+    def import_csv(self, path, chunksize=10_000):
+        """
+        Streams a scale export or order sheet CSV into the tables.
+
+        The file is read `chunksize` rows at a time; each chunk is validated
+        (types, ham option, duplicate ids) and its good rows are bulk-added.
+        Bad rows are reported with their line number instead of aborting.
+        Turkey files need tid and weight columns, order files an oid column
+        plus any of target_weight, name, ham and notes.
+
+        Args:
+            path (str): the CSV file.
+            chunksize (int): rows read and validated at a time.
+
+        Returns:
+            ImportReport: rows added and rows rejected (with reasons).
+        """
+        kind = sniff_kind(path)
+        report = ImportReport(kind)
+        if kind == "turkeys":
+            columns, required, parse, exists, add = TURKEY_COLUMNS, TURKEY_COLUMNS, parse_turkeys, self._turkey_exists, self.add_turkeys
+        else:
+            columns, required, parse, exists, add = ORDER_COLUMNS, ["oid"], parse_orders, self._order_exists, self.add_orders
+
+        for chunk, lines in read_chunks(path, columns, required, chunksize):
+            # Lock per chunk, so other sessions are not blocked for the whole file
+            with self.lock:
+                report.added += add(parse(chunk, lines, exists, report))
+
+        metrics.count("imported rows", report.added)
+        metrics.count("rejected import rows", report.rejected)
+        log.info("%s", report)
+        return report
+
+    @profiled
+    @synchronized
+    @undoable("Set order range")
+    def constrain_order(self, oid, min_weight=None, max_weight=None, priority=None):
+        """
+        Sets the weight range and priority tier the constrained auto match uses
+        for an order. None clears a setting.
+
+        Args:
+            oid: the order.
+            min_weight, max_weight (float): the acceptable turkey weights; without
+                them the range is the target weight ± the match tolerance.
+            priority (int): the tier, lower served first; without it flagged
+                notes, then ham orders, then the rest (see default_priority).
+        """
+        if not self._order_exists(oid):
+            raise ValueError(f"Order with oid={oid} does not exist!")
+        if min_weight is not None and max_weight is not None and min_weight > max_weight:
+            raise ValueError(f"Order {oid} cannot have a minimum weight above its maximum!")
+
+        old = self._constraint_records([oid]) or [("constrain_order", oid, *NO_CONSTRAINTS)]
+        values = (min_weight, max_weight, priority)
+        if values == NO_CONSTRAINTS:
+            self._constraints.pop(oid, None)
+        else:
+            self._constraints[oid] = values
+        self._changed("orders", [oid])
+        self._log(("constrain_order", oid, min_weight, max_weight, priority))
+        self._history.record([("constrain_order", oid, min_weight, max_weight, priority)], old)
+        log.info("Order %s range set to %s-%s lbs, priority %s", oid, min_weight, max_weight, priority)
+
+    def constraints(self, oid):
+        """
+        The (min_weight, max_weight, priority) set on an order, None where unset.
+        A single dict read, so the UI may call it without the lock.
+        """
+        return self._constraints.get(oid, NO_CONSTRAINTS)
 
+    def _constraint_records(self, oids):
+        # constrain_order records that restore the constraints set on these orders
+        return [("constrain_order", oid, *self._constraints[oid]) for oid in oids if oid in self._constraints]
+
+    @profiled
+    @synchronized
+    @undoable("Match")
     def match(self,oid,tid):
         # Check if turkey exists and is free
-        if tid not in self.turkeys.index:
+        if not self._turkey_exists(tid):
             raise ValueError(f"Turkey with tid={tid} does not exist!")
-        if self.turkeys.loc[tid, "assigned"]:
+        if tid in self._oid_by_tid:
             raise ValueError(f"Turkey with tid={tid} is already assigned!")
 
         # Check if order exists and has no turkey yet
-        if oid not in self.orders.index:
+        if not self._order_exists(oid):
             raise ValueError(f"Order with oid={oid} does not exist!")
-        if pd.notna(self.orders.loc[oid, "assigned_tid"]):
+        if oid in self._tid_by_oid:
             raise ValueError(f"Order with oid={oid} already has a turkey assigned!")
 
-        #perform match
+        #perform match, in place wherever the rows are (new ones may still be buffered)
              # 1. Assign turkey ID to the order
-        self.orders.loc[oid, "assigned_tid"] = tid
+        self._orders.set(oid, "assigned_tid", tid)
 
             # 2. Assign the turkey's weight to the order
-        self.orders.loc[oid, "assigned_weight"] = self.turkeys.loc[tid, "weight"]
+        self._orders.set(oid, "assigned_weight", self._turkeys.get(tid, "weight"))
 
             # 3. Mark turkey as assigned
-        self.turkeys.loc[tid, "assigned"] = True
-
-        print(f"Order {oid} matched with Turkey {tid} successfully!")
+        self._turkeys.set(tid, "assigned", True)
+        self._free_turkeys.remove(tid)
+        self._tid_by_oid[oid] = tid
+        self._move_orders([oid], self._waiting_orders, self._matched_orders)
+        self._oid_by_tid[tid] = oid
+        self._changed("orders", [oid])
+        self._changed("turkeys", [tid])
+        self._log(("match", oid, tid))
+        self._history.record([("match", oid, tid)], [("remove_match_by_oid", oid)])
+
+        metrics.count("matches")
+        log.info("Order %s matched with Turkey %s", oid, tid)
+
+    @profiled
+    @synchronized
+    @undoable("Match orders")
+    def match_many(self, pairs):
+        """
+        Matches many (oid, tid) pairs at once, all or nothing.
 
-    def auto_match(self):
-        print("=== AUTO MATCH START ===")
+        Every pair is checked before anything is written; the tables are then
+        updated with one column-wise write each.
 
-        # Only unassigned orders & turkeys
-        orders = self.orders[self.orders["assigned_tid"].isna() & (self.orders["target_weight"] != 0)].copy()
-        turkeys = self.turkeys[~self.turkeys["assigned"]].copy()
+        Args:
+            pairs: iterable of (oid, tid).
 
-        if orders.empty:
-            print("No unassigned orders.")
-            return
-        if turkeys.empty:
-            print("No unassigned turkeys.")
-            return
+        Returns:
+            int: the number of pairs matched.
+        """
+        pairs = list(pairs)
+        if not pairs:
+            return 0
+        oids = [oid for oid, _ in pairs]
+        tids = [tid for _, tid in pairs]
+
+        # Check every pair before touching the tables
+        if len(set(oids)) != len(oids):
+            raise ValueError("An order appears more than once in the pairs to match!")
+        if len(set(tids)) != len(tids):
+            raise ValueError("A turkey appears more than once in the pairs to match!")
+        missing_tids = [tid for tid in tids if not self._turkey_exists(tid)]
+        if missing_tids:
+            raise ValueError(f"Turkeys with tid={missing_tids} do not exist!")
+        missing_oids = [oid for oid in oids if not self._order_exists(oid)]
+        if missing_oids:
+            raise ValueError(f"Orders with oid={missing_oids} do not exist!")
+        assigned = [tid for tid in tids if tid in self._oid_by_tid]
+        if assigned:
+            raise ValueError(f"Turkeys with tid={assigned} are already assigned!")
+        has_turkey = [oid for oid in oids if oid in self._tid_by_oid]
+        if has_turkey:
+            raise ValueError(f"Orders with oid={has_turkey} already have a turkey assigned!")
+
+        # Perform all matches column by column
+        weights = list(self._turkeys.rows(tids)["weight"].to_numpy())
+        self._orders.set_many(oids, "assigned_tid", tids)
+        self._orders.set_many(oids, "assigned_weight", weights)
+        self._turkeys.set_many(tids, "assigned", True)
+        self._free_turkeys.remove_many(tids)
+        self._tid_by_oid.update(zip(oids, tids))
+        self._move_orders(oids, self._waiting_orders, self._matched_orders)
+        self._oid_by_tid.update(zip(tids, oids))
+        self._changed("orders", oids)
+        self._changed("turkeys", tids)
+        self._log(*(("match", oid, tid) for oid, tid in pairs))
+        self._history.record([("match_many", pairs)], [("unmatch_many", oids)])
+
+        metrics.count("matches", len(pairs))
+        log.info("%d orders matched", len(pairs))
+        return len(pairs)
+
+    @profiled
+    @synchronized
+    @undoable("Auto match")
+    def auto_match(self, strategy="greedy", tolerance=DEFAULT_TOLERANCE):
+        """
+        Matches every unassigned order (with a target weight) to a free turkey.
 
-        # Sort orders by target_weight (or OID if you prefer)
-        orders = orders.sort_values(by=["target_weight", "oid"])  # optional OID secondary sort
+        Args:
+            strategy (str): "greedy" gives each order, lightest first, the closest
+                remaining turkey. "min_total" and "min_max" find the pairing with
+                the lowest total / largest absolute weight deviation.
+                "constrained" only assigns turkeys inside each order's range and
+                serves higher priority tiers first (see constrain_order).
+            tolerance (float): for "constrained", the range of orders without
+                one: target weight ± tolerance.
+
+        Returns:
+            dict: the quality score of the run (see matching.match_score); for
+            "constrained" also "unmatched", the reason per order left without a turkey.
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown matching strategy {strategy!r}!")
 
-        # Sort turkeys by weight
-        turkeys = turkeys.sort_values(by="weight")
+        if strategy == "constrained":
+            # Orders with a range but no target weight can be matched too
+            orders = self.orders[self.orders["assigned_tid"].isna()].copy()
+        else:
+            # Only unassigned orders & turkeys
+            orders = self.orders[self.orders["assigned_tid"].isna() & (self.orders["target_weight"] != 0)].copy()
+        turkeys = self.turkeys[~self.turkeys["assigned"]].copy()
 
-        for oid, order in orders.iterrows():
-            if turkeys.empty:
-                print("No turkeys left to assign.")
+        if orders.empty:
+            log.info("Auto match: no unassigned orders.")
+            return match_score(strategy, [])
+        if turkeys.empty and strategy != "constrained":
+            log.info("Auto match: no unassigned turkeys.")
+            return match_score(strategy, [])
+
+        unmatched = None
+        if strategy == "constrained":
+            pairs, unmatched = self._constrained_pairs(orders, turkeys, tolerance)
+        elif strategy == "greedy":
+            pairs = self._greedy_pairs(orders, turkeys)
+        else:
+            order_idx, turkey_idx = optimal_pairs(
+                orders["target_weight"].to_numpy(dtype=float),
+                turkeys["weight"].to_numpy(dtype=float),
+                strategy,
+            )
+            pairs = list(zip(orders.index[order_idx], turkeys.index[turkey_idx]))
+
+        oids = [oid for oid, _ in pairs]
+        tids = [tid for _, tid in pairs]
+        target_weights = orders.loc[oids, "target_weight"].to_numpy(dtype=float)
+        turkey_weights = turkeys.loc[tids, "weight"].to_numpy(dtype=float)
+        if log.isEnabledFor(logging.DEBUG):
+            for oid, tid, target_weight, turkey_weight in zip(oids, tids, target_weights, turkey_weights):
+                log.debug("Assigning Order %s (%s lbs) → Turkey %s (%s lbs)", oid, target_weight, tid, turkey_weight)
+
+        # Match them all in one go
+        self.match_many(pairs)
+
+        # Orders matched on a range alone have no target to deviate from
+        deviations = abs(turkey_weights - target_weights) * (target_weights != 0)
+        score = match_score(strategy, deviations)
+        log.info("Auto match (%s): %d orders, total deviation %.2f lbs, max deviation %.2f lbs",
+                 strategy, score["matched"], score["total_deviation"], score["max_deviation"])
+        if unmatched is not None:
+            score["unmatched"] = unmatched
+            if unmatched:
+                log.info("Auto match (%s): %d orders left unmatched", strategy, len(unmatched))
+            for oid, why in unmatched.items():
+                log.debug("Order %s unmatched: %s", oid, why)
+        return score
+
+    def _constrained_pairs(self, orders, turkeys, tolerance):
+        # Ranges and tiers per order, with the defaults filled in
+        orders = orders.sort_index()
+        targets = orders["target_weight"].to_numpy(dtype=float)
+        constraints = [self._constraints.get(oid, NO_CONSTRAINTS) for oid in orders.index]
+        # None becomes NaN
+        min_weights = np.array([low for low, _, _ in constraints], dtype=float)
+        max_weights = np.array([high for _, high, _ in constraints], dtype=float)
+        has_target = targets != 0
+        unranged = ~has_target & pd.isna(min_weights) & pd.isna(max_weights)
+        lows = np.where(pd.isna(min_weights), np.where(has_target, targets - tolerance, 0.0), min_weights)
+        highs = np.where(pd.isna(max_weights), np.where(has_target, targets + tolerance, np.inf), max_weights)
+        tiers = [
+            default_priority(ham, notes) if priority is None else int(priority)
+            for ham, notes, (_, _, priority) in zip(orders["ham"], orders["notes"], constraints)
+        ]
+
+        candidates = np.flatnonzero(~unranged)
+        order_idx, turkey_idx, left_over = constrained_pairs(
+            lows[candidates], highs[candidates], [tiers[i] for i in candidates],
+            turkeys["weight"].to_numpy(dtype=float),
+        )
+        oids = orders.index[candidates].tolist()
+        pairs = list(zip(orders.index[candidates[order_idx]], turkeys.index[turkey_idx]))
+        unmatched = {oid: "no target weight or range" for oid in orders.index[unranged]}
+        unmatched.update((oids[i], why) for i, why in left_over)
+        return pairs, unmatched
+
+    def _greedy_pairs(self, orders, turkeys):
+        # Lightest order first (then by oid), each taking the free turkey
+        # closest to its target; ties go to the lighter bird. A WeightIndex
+        # finds and drops that turkey with a bisect instead of a scan.
+        orders = orders.sort_values(by=["target_weight", "oid"])
+        free = WeightIndex()
+        free.add_many(turkeys["weight"].items())
+
+        pairs = []
+        for oid, target_weight in orders["target_weight"].items():
+            if not len(free):
+                log.info("No turkeys left to assign.")
                 break
-
-            # Find turkey with closest weight
-            diffs = (turkeys["weight"] - order["target_weight"]).abs()
-            tid = diffs.idxmin()
-            turkey_weight = turkeys.loc[tid, "weight"]
-
-            print(f"Assigning Order {oid} ({order['target_weight']} lbs) → Turkey {tid} ({turkey_weight} lbs)")
-
-            # Match them
-            self.match(oid, tid)
-
-            # Remove assigned turkey
-            turkeys = turkeys.drop(tid)
-
-        print("=== AUTO MATCH END ===")
-
+            [(tid, _)] = free.nearest(target_weight)
+            pairs.append((oid, tid))
+            free.remove(tid)
+        return pairs
+
+    @profiled
+    @synchronized
+    @undoable("Unmatch")
     def remove_match_by_oid(self, oid):
         # Check if order exists
-        if oid not in self.orders.index:
+        if not self._order_exists(oid):
             raise ValueError(f"Order with oid={oid} does not exist!")
 
         # Check if order actually has a turkey assigned
-        assigned_tid = self.orders.loc[oid, "assigned_tid"]
-        if assigned_tid == 0:
+        if oid not in self._tid_by_oid:
             raise ValueError(f"Order {oid} has no turkey assigned to remove!")
 
         # ---------- Perform remove ----------
+        assigned_tid = self._tid_by_oid.pop(oid)
+        self._move_orders([oid], self._matched_orders, self._waiting_orders)
+        del self._oid_by_tid[assigned_tid]
         # 1. Remove turkey assignment from the order
-        self.orders.loc[oid, "assigned_tid"] = pd.NA
-        self.orders.loc[oid, "assigned_weight"] = pd.NA
+        self._orders.set(oid, "assigned_tid", pd.NA)
+        self._orders.set(oid, "assigned_weight", pd.NA)
         # 2. Mark turkey as unassigned
-        self.turkeys.loc[assigned_tid, "assigned"] = False
-
-        print(f"Match removed: Order {oid} is no longer assigned to Turkey {assigned_tid}.")
-
+        self._turkeys.set(assigned_tid, "assigned", False)
+        self._free_turkeys.add(assigned_tid, self._turkeys.get(assigned_tid, "weight"))
+        self._changed("orders", [oid])
+        self._changed("turkeys", [assigned_tid])
+        self._log(("remove_match_by_oid", oid))
+        self._history.record([("remove_match_by_oid", oid)], [("match", oid, assigned_tid)])
+
+        metrics.count("unmatches")
+        log.info("Match removed: Order %s is no longer assigned to Turkey %s", oid, assigned_tid)
+
+    @profiled
+    @synchronized
+    @undoable("Unmatch")
     def remove_match_by_tid(self, tid):
         # Check if turkey exists
-        if tid not in self.turkeys.index:
+        if not self._turkey_exists(tid):
             raise ValueError(f"Turkey with tid={tid} does not exist!")
 
         # Check if turkey is actually assigned
-        if not self.turkeys.loc[tid, "assigned"]:
+        if tid not in self._oid_by_tid:
             raise ValueError(f"Turkey with tid={tid} is not currently assigned to any order!")
 
-        # Find the order that has this turkey assigned
-        orders_with_tid = self.orders[self.orders["assigned_tid"] == tid]
-        if orders_with_tid.empty:
-            raise ValueError(f"No order found with turkey {tid} assigned!")  # should not happen if logic is correct
-
-        # There should be only one order per turkey
-        oid = orders_with_tid.index[0]
-
         # ---------- Perform remove ----------
-        self.orders.loc[oid, "assigned_tid"] = pd.NA
-        self.orders.loc[oid, "assigned_weight"] = pd.NA
-        self.turkeys.loc[tid, "assigned"] = False
-
-        print(f"Match removed: Turkey {tid} is no longer assigned to Order {oid}.")
-
+        oid = self._oid_by_tid.pop(tid)
+        del self._tid_by_oid[oid]
+        self._move_orders([oid], self._matched_orders, self._waiting_orders)
+        self._orders.set(oid, "assigned_tid", pd.NA)
+        self._orders.set(oid, "assigned_weight", pd.NA)
+        self._turkeys.set(tid, "assigned", False)
+        self._free_turkeys.add(tid, self._turkeys.get(tid, "weight"))
+        self._changed("orders", [oid])
+        self._changed("turkeys", [tid])
+        self._log(("remove_match_by_tid", tid))
+        self._history.record([("remove_match_by_tid", tid)], [("match", oid, tid)])
+
+        metrics.count("unmatches")
+        log.info("Match removed: Turkey %s is no longer assigned to Order %s", tid, oid)
+
+    @profiled
+    @synchronized
+    @undoable("Delete order")
     def remove_order(self, oid):
         # Check if order exists
-        if oid not in self.orders.index:
+        if not self._order_exists(oid):
             raise ValueError(f"Order with oid={oid} does not exist!")
 
-        assigned_tid = self.orders.loc[oid, "assigned_tid"]
-
         # Only unassign if a turkey is actually assigned
-        if pd.notna(assigned_tid):
+        if oid in self._tid_by_oid:
             self.remove_match_by_oid(oid)
 
-        # Now safe to remove the order
-        self.orders.drop(oid, inplace=True)
-        print(f"Order {oid} removed from the table successfully.")
-
+        # Now safe to remove the order; the row is only dropped on the next full read
+        order = self._orders.row(oid)
+        self._orders.delete(oid)
+        self._waiting_orders.discard(oid)
+        self._ham_counts[order["ham"]] -= 1
+        self._changed("orders", [oid])
+        self._log(("remove_order", oid))
+        self._history.record(
+            [("remove_order", oid)],
+            [("add_order", oid, order["target_weight"], order["name"], order["ham"], order["notes"]),
+             *self._constraint_records([oid])],
+        )
+        self._constraints.pop(oid, None)
+        log.info("Order %s removed", oid)
+
+    @profiled
+    @synchronized
+    @undoable("Delete turkey")
     def remove_turkey(self, tid):
         # Check if turkey exists
-        if tid not in self.turkeys.index:
+        if not self._turkey_exists(tid):
             raise ValueError(f"Turkey with tid={tid} does not exist!")
         # Check if turkey is assigned
-        if self.turkeys.loc[tid, "assigned"]:
+        if tid in self._oid_by_tid:
             self.remove_match_by_tid(tid)
-        # Remove the turkey from the table
-        self.turkeys.drop(tid, inplace=True)
+        # Remove the turkey from the table; the row is only dropped on the next full read
+        weight = self._turkeys.get(tid, "weight")
+        self._turkeys.delete(tid)
+        self._free_turkeys.remove(tid)
+        self._changed("turkeys", [tid])
+        self._log(("remove_turkey", tid))
+        self._history.record([("remove_turkey", tid)], [("add_turkey", tid, weight)])
+
+        log.info("Turkey %s removed", tid)
+
+    @profiled
+    @synchronized
+    @undoable("Unmatch orders")
+    def unmatch_many(self, oids):
+        """
+        Removes the matches of many orders at once, all or nothing.
 
-        print(f"Turkey {tid} removed from the table successfully.")
+        Args:
+            oids: iterable of matched order ids.
 
-    def list_orders(self):
-        return self.orders.reset_index().to_dict(orient="records")
+        Returns:
+            int: the number of matches removed.
+        """
+        oids = list(oids)
+        if not oids:
+            return 0
+        if len(set(oids)) != len(oids):
+            raise ValueError("An order appears more than once in the matches to remove!")
+        unmatched = [oid for oid in oids if oid not in self._tid_by_oid]
+        if unmatched:
+            raise ValueError(f"Orders with oid={unmatched} have no turkey assigned to remove!")
+
+        tids = [self._tid_by_oid.pop(oid) for oid in oids]
+        self._move_orders(oids, self._matched_orders, self._waiting_orders)
+        for tid in tids:
+            del self._oid_by_tid[tid]
+        self._orders.set_many(oids, "assigned_tid", pd.NA)
+        self._orders.set_many(oids, "assigned_weight", pd.NA)
+        self._turkeys.set_many(tids, "assigned", False)
+        self._free_turkeys.add_many(zip(tids, self._turkeys.rows(tids)["weight"].tolist()))
+        self._changed("orders", oids)
+        self._changed("turkeys", tids)
+        self._log(*(("remove_match_by_oid", oid) for oid in oids))
+        self._history.record([("unmatch_many", oids)], [("match_many", list(zip(oids, tids)))])
+
+        metrics.count("unmatches", len(oids))
+        log.info("%d matches removed", len(oids))
+        return len(oids)
+
+    @profiled
+    @synchronized
+    @undoable("Delete orders")
+    def remove_orders(self, oids):
+        """
+        Removes many orders at once, all or nothing, unmatching them first.
 
-    def list_turkeys(self):
-        return self.turkeys.reset_index().to_dict(orient="records")
+        Returns:
+            int: the number of orders removed.
+        """
+        oids = list(oids)
+        if not oids:
+            return 0
+        if len(set(oids)) != len(oids):
+            raise ValueError("An order appears more than once in the orders to remove!")
+        missing = [oid for oid in oids if not self._order_exists(oid)]
+        if missing:
+            raise ValueError(f"Orders with oid={missing} do not exist!")
+
+        self.unmatch_many([oid for oid in oids if oid in self._tid_by_oid])
+        rows = self._orders.rows(oids)
+        orders = list(zip(oids, *(rows[column].tolist() for column in ["target_weight", "name", "ham", "notes"])))
+        constraints = self._constraint_records(oids)
+        for oid in oids:
+            self._orders.delete(oid)
+            self._constraints.pop(oid, None)
+        self._waiting_orders.remove_many([oid for oid in oids if oid in self._waiting_orders])
+        self._ham_counts.subtract(rows["ham"].tolist())
+        self._changed("orders", oids)
+        self._log(*(("remove_order", oid) for oid in oids))
+        self._history.record([("remove_orders", oids)], [("add_orders", orders), *constraints])
+        log.info("%d orders removed", len(oids))
+        return len(oids)
+
+    @profiled
+    @synchronized
+    @undoable("Delete turkeys")
+    def remove_turkeys(self, tids):
+        """
+        Removes many turkeys at once, all or nothing, unmatching them first.
 
-    def export_turkey_orders_pdf(self, filename: str = "orders_turkey_report.pdf"):
+        Returns:
+            int: the number of turkeys removed.
         """
-        Creates a PDF from the orders DataFrame and saves it, excluding orders with target_weight = 0.
+        tids = list(tids)
+        if not tids:
+            return 0
+        if len(set(tids)) != len(tids):
+            raise ValueError("A turkey appears more than once in the turkeys to remove!")
+        missing = [tid for tid in tids if not self._turkey_exists(tid)]
+        if missing:
+            raise ValueError(f"Turkeys with tid={missing} do not exist!")
+
+        self.unmatch_many([self._oid_by_tid[tid] for tid in tids if tid in self._oid_by_tid])
+        turkeys = list(zip(tids, self._turkeys.rows(tids)["weight"].tolist()))
+        for tid in tids:
+            self._turkeys.delete(tid)
+        self._free_turkeys.remove_many(tids)
+        self._changed("turkeys", tids)
+        self._log(*(("remove_turkey", tid) for tid in tids))
+        self._history.record([("remove_turkeys", tids)], [("add_turkeys", turkeys)])
+        log.info("%d turkeys removed", len(tids))
+        return len(tids)
+
+    @profiled
+    @synchronized
+    def undo(self):
+        """
+        Reverts the caller's last command (a match, a delete, a whole auto
+        match run...). Calls made through a Session are its owner's; other
+        calls share one history of their own.
 
-        Args:
-            filename (str): The filename for the saved PDF.
+        Returns:
+            str: what was undone, e.g. "Auto match".
         """
-        # Filter out orders with target_weight == 0
-        df = self.orders[self.orders["target_weight"] != 0].sort_values(by='name')
+        label = self._history.undo(self)
+        log.info("Undid %s", label)
+        return label
 
-        if df.empty:
-            print("No orders with target weight > 0 to export.")
-            return
+    @profiled
+    @synchronized
+    def redo(self):
+        """
+        Applies the caller's last undone command again.
 
-        pdf = FPDF()
-        pdf.add_page()
-        pdf.set_font("Arial", "B", 14)
-
-        # Add a title
-        pdf.cell(200, 10, txt="Orders Report", ln=True, align="C")
-        pdf.ln(10)
-
-        pdf.set_font("Arial", size=12)
-        col_width = pdf.w / 6  # 6 columns
-        row_height = pdf.font_size * 1.5
-
-        headers = ["Name", "Turkey #", "Assigned lbs", "Target lbs", "Ham", "Notes"]
-
-        # Add table header using custom names
-        for header in headers:
-            pdf.cell(col_width, row_height, txt=header, border=1, align="C")
-        pdf.ln(row_height)
-
-        # Add table rows
-        for _, row in df.iterrows():
-            row_values = [
-                row["name"],
-                row["assigned_tid"] if pd.notna(row["assigned_tid"]) else "",
-                row["assigned_weight"] if pd.notna(row["assigned_weight"]) else "",
-                row["target_weight"],
-                row["ham"],
-                row["notes"],
-            ]
-            for item in row_values:
-                pdf.cell(col_width, row_height, txt=str(item), border=1, align="C")
-            pdf.ln(row_height)
-
-        # Save PDF
-        pdf.output(filename)
-        print(f"PDF saved as '{filename}'")
+        Returns:
+            str: what was redone.
+        """
+        label = self._history.redo(self)
+        log.info("Redid %s", label)
+        return label
 
-    def export_free_turkeys_pdf(self, filename: str = "free_turkeys.pdf"):
+    @synchronized
+    def undo_labels(self):
         """
-        Creates a PDF listing only unassigned turkeys.
-        Columns: Name, Turkey #, Assigned lbs, Target lbs, Ham, Notes
-        Only Turkey # and Assigned lbs are filled; others are blank.
+        Returns:
+            (undo, redo): labels of the commands undo and redo would apply, or None.
+        """
+        return self._history.undo_label(), self._history.redo_label()
+
+    def session(self, owner):
+        """
+        Returns:
+            Session: this backend acting for `owner` (e.g. a browser session id),
+                with its own undo history.
+        """
+        return Session(self, owner)
+
+    @synchronized
+    def end_session(self, owner):
+        # The session is gone: nobody can undo its commands any more
+        self._history.forget(owner)
+
+    @synchronized
+    def nearest_free_turkeys(self, weight, k=1):
+        """
+        Finds the free turkeys closest to a weight without scanning the table.
+
+        Args:
+            weight (float): the weight to look around.
+            k (int): how many turkeys to return at most.
+
+        Returns:
+            list: up to k records {"tid", "weight"}, closest first.
         """
-        df = self.turkeys[self.turkeys["assigned"] == False].sort_values(by='weight')  # get unassigned turkeys
+        return [{"tid": tid, "weight": w} for tid, w in self._free_turkeys.nearest(weight, k)]
 
-        pdf = FPDF()
-        pdf.add_page()
-        pdf.set_font("Arial", "B", 14)
+    @profiled
+    @synchronized
+    def suggest_turkeys(self, oid, k=5):
+        """
+        Suggests the k free turkeys closest to an order's target weight.
 
-        # Title
-        pdf.cell(200, 10, txt="Free Turkeys Report", ln=True, align="C")
-        pdf.ln(10)
+        Args:
+            oid: the order to suggest turkeys for.
+            k (int): how many suggestions to return at most.
 
-        pdf.set_font("Arial", size=12)
+        Returns:
+            list: up to k records {"tid", "weight"}, closest first.
+        """
+        if oid not in self._orders:
+            raise ValueError(f"Order with oid={oid} does not exist!")
+        return self.nearest_free_turkeys(self._orders.get(oid, "target_weight"), k)
 
-        headers = ["Name", "Turkey #", "Assigned lbs", "Target lbs", "Ham", "Notes"]
-        col_width = pdf.w / len(headers)  # divide page width evenly
-        row_height = pdf.font_size * 1.5
+    @synchronized
+    def dashboard(self, bin_width=1.0):
+        """
+        Supply and demand at a glance, read from running counts (no table scan).
 
-        # Table header
-        for header in headers:
-            pdf.cell(col_width, row_height, txt=header, border=1, align="C")
-        pdf.ln(row_height)
+        Args:
+            bin_width (float): histogram bin size in lbs.
 
-        # Table rows
-        for tid, turkey in df.to_dict("index").items():
-            row_data = ["", tid, turkey["weight"], "", "", ""]  # only Turkey # and Assigned lbs filled
-            for item in row_data:
-                pdf.cell(col_width, row_height, txt=str(item), border=1, align="C")
-            pdf.ln(row_height)
+        Returns:
+            dict: "free_turkeys" and "waiting_orders" histograms (bin start ->
+            count, by turkey weight / target weight), "ham" (orders per ham
+            option), and the totals "orders", "matched", "unmatched",
+            "turkeys", "free_turkeys_total".
+        """
+        if bin_width <= 0:
+            raise ValueError("The bin width must be positive!")
+        orders = len(self._orders)
+        turkeys = len(self._turkeys)
+        return {
+            "free_turkeys": self._free_turkeys.histogram(bin_width),
+            "waiting_orders": self._waiting_orders.histogram(bin_width),
+            "ham": {ham: n for ham, n in self._ham_counts.items() if n > 0},
+            "orders": orders,
+            "matched": len(self._tid_by_oid),
+            "unmatched": orders - len(self._tid_by_oid),
+            "turkeys": turkeys,
+            "free_turkeys_total": len(self._free_turkeys),
+        }
 
-        pdf.output(filename)
-        print(f"PDF saved as '{filename}'")
+    @profiled
+    @synchronized
+    def search_orders(self, query):
+        """
+        Finds orders by oid, name or notes, ignoring case. Each word of the
+        query must appear in the order: anywhere for words of three or more
+        characters, at the start of a word for shorter ones.
 
-    def export_ham_orders_without_turkey(self, filename: str = "ham_orders_report.pdf"):
+        Returns:
+            set: the matching oids, or None for an empty query.
         """
-        Creates a PDF from orders that have ham and no assigned turkey.
+        if not query.strip():
+            return None
+        index = self._search
+        changes = None
+        if index.version is not None:
+            changed = self.changes_since(index.version)
+            if changed is not None:
+                changes = [key for table, key in changed if table == "orders"]
+        index.update(self._orders, self.version, changes)
+        return index.search(query)
+
+    @synchronized
+    def list_orders(self):
+        return self.orders.reset_index().to_dict(orient="records")
+
+    @synchronized
+    def list_turkeys(self):
+        return self.turkeys.reset_index().to_dict(orient="records")
+
+    @profiled
+    def export_turkey_orders_pdf(self, filename: str = "orders_turkey_report.pdf"):
+        """
+        Creates a PDF from the orders DataFrame and saves it, excluding orders with target_weight = 0.
+        Skipped if the rows it shows are unchanged since the last export.
 
         Args:
             filename (str): The filename for the saved PDF.
         """
-        # Filter orders: ham is not 'None' and assigned_tid is NaN
-        df = self.orders[
-            (self.orders["ham"] != "None") & (self.orders["assigned_tid"].isna())
-            ].sort_values(by="name")
+        return reports.export("orders", self.copy_tables()[0], filename, self._report_cache)
 
-        if df.empty:
-            print("No ham orders without assigned turkeys.")
-            return
+    @profiled
+    def export_free_turkeys_pdf(self, filename: str = "free_turkeys.pdf"):
+        """
+        Creates a PDF listing only unassigned turkeys.
+        Skipped if the free turkeys are unchanged since the last export.
+        """
+        return reports.export("free_turkeys", self.copy_tables()[1], filename, self._report_cache)
 
-        pdf = FPDF()
-        pdf.add_page()
-        pdf.set_font("Arial", "B", 14)
+    @profiled
+    def export_ham_orders_without_turkey(self, filename: str = "ham_orders_report.pdf"):
+        """
+        Creates a PDF from orders that have ham and no assigned turkey.
+        Skipped if the rows it shows are unchanged since the last export.
 
-        # Add a title
-        pdf.cell(200, 10, txt="Ham Orders Without Assigned Turkeys", ln=True, align="C")
-        pdf.ln(10)
+        Args:
+            filename (str): The filename for the saved PDF.
+        """
+        return reports.export("ham_orders", self.copy_tables()[0], filename, self._report_cache)
 
-        pdf.set_font("Arial", size=12)
-        col_width = pdf.w / 4  # three columns + some extra space
-        row_height = pdf.font_size * 1.5
+    @profiled
+    def export_pickup_tickets(self, filename: str = "pickup_tickets.pdf", order_by: str = "oid"):
+        """
+        Creates a PDF with one pickup ticket per order, for the customer pickup step.
 
-        headers = ["Name", "Ham", "Notes"]
+        Args:
+            filename (str): The filename for the saved PDF.
+            order_by (str): "oid" or "name".
+        """
+        # A copy, since large runs render in worker processes while edits go on
+        return tickets.pickup_tickets_pdf(self.copy_tables()[0], filename, order_by)
 
-        # Table header
-        for header in headers:
-            pdf.cell(col_width, row_height, txt=header, border=1, align="C")
-        pdf.ln(row_height)
+    @profiled
+    @synchronized
+    def report_jobs(self):
+        """
+        Snapshots the tables for render_reports; cheap enough for the UI thread.
 
-        # Table rows
-        for _, row in df.iterrows():
-            row_values = [
-                row["name"],
-                row["ham"],
-                row["notes"],
-            ]
-            for item in row_values:
-                pdf.cell(col_width, row_height, txt=str(item), border=1, align="C")
-            pdf.ln(row_height)
+        Returns:
+            (jobs, hits): the reports to render and the names of those already up to date.
+        """
+        return reports.report_jobs(self.orders, self.turkeys, self._report_cache)
 
-        # Save PDF
-        pdf.output(filename)
-        print(f"PDF saved as '{filename}'")
+    @profiled
+    def render_reports(self, jobs, on_progress=None):
+        """
+        Renders the jobs from report_jobs in the worker pool; blocks until done.
+        """
+        return reports.render_reports(jobs, self._report_cache, on_progress)
 
+    @synchronized
     def print_tables(self):
         print("Orders:")
         print(self.orders, "\n")
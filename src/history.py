@@ -0,0 +1,190 @@
+import functools
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+# How many commands can be undone
+UNDO_LIMIT = 100
+
+
+class History:
+    """
+    Undo and redo stacks of Backend commands.
+
+    A command is one user action: the backend calls that redo it and the calls
+    that undo it, both as ("method", *args) records like the journal's. Calls
+    made inside another undoable call (auto_match's match_many, remove_order's
+    unmatch) join the outer command, so an auto match run undoes in one step.
+    Undoing or redoing replays only those calls, so it costs as much as the
+    change did, however large the tables are.
+
+    Every command belongs to the session that made it (see Session), and each
+    session undoes and redoes only its own, so Ctrl+Z in one browser never
+    reverts another's work.
+    """
+
+    def __init__(self, limit=UNDO_LIMIT):
+        self._limit = limit
+        self._undo = {}  # owner -> deque of commands
+        self._redo = {}  # owner -> list of commands
+        # What the current thread is doing: the owner it acts for, the
+        # command it is building and whether it is replaying
+        self._local = threading.local()
+
+    @contextmanager
+    def acting_as(self, owner):
+        """Tags the commands the current thread makes inside the block with `owner`."""
+        previous = getattr(self._local, "owner", None)
+        self._local.owner = owner
+        try:
+            yield
+        finally:
+            self._local.owner = previous
+
+    @contextmanager
+    def replaying(self):
+        """Calls made by the current thread inside the block are not recorded."""
+        previous = self.is_replaying()
+        self._local.replaying = True
+        try:
+            yield
+        finally:
+            self._local.replaying = previous
+
+    def is_replaying(self):
+        return getattr(self._local, "replaying", False)
+
+    def begin(self, label):
+        # Returns whether this call opened a command (False when nested or replaying)
+        if self.is_replaying() or getattr(self._local, "command", None) is not None:
+            return False
+        self._local.command = (label, [], [])
+        return True
+
+    def end(self):
+        label, forward, inverse = self._local.command
+        self._local.command = None
+        if forward:
+            owner = self._owner()
+            self._undo.setdefault(owner, deque(maxlen=self._limit)).append((label, forward, inverse))
+            self._redo.pop(owner, None)
+
+    def record(self, forward, inverse):
+        """
+        Adds a finished change to the open command.
+
+        Args:
+            forward: records that redo the change.
+            inverse: records that undo it, in the order they must run.
+        """
+        command = getattr(self._local, "command", None)
+        if command is None:
+            return
+        command[1].extend(forward)
+        command[2].append(inverse)
+
+    def undo_label(self):
+        undo = self._undo.get(self._owner())
+        return undo[-1][0] if undo else None
+
+    def redo_label(self):
+        redo = self._redo.get(self._owner())
+        return redo[-1][0] if redo else None
+
+    def undo(self, backend):
+        """
+        Undoes the current owner's last command.
+
+        Returns:
+            str: the label of the command undone.
+        """
+        owner = self._owner()
+        if not self._undo.get(owner):
+            raise ValueError("Nothing to undo!")
+        label, forward, inverse = self._undo[owner].pop()
+        # Later changes first, each one's records in order
+        self._replay(backend, owner, label, [record for piece in reversed(inverse) for record in piece])
+        self._redo.setdefault(owner, []).append((label, forward, inverse))
+        return label
+
+    def redo(self, backend):
+        """
+        Redoes the current owner's last undone command.
+
+        Returns:
+            str: the label of the command redone.
+        """
+        owner = self._owner()
+        if not self._redo.get(owner):
+            raise ValueError("Nothing to redo!")
+        label, forward, inverse = self._redo[owner].pop()
+        self._replay(backend, owner, label, forward)
+        self._undo[owner].append((label, forward, inverse))
+        return label
+
+    def _replay(self, backend, owner, label, records):
+        with self.replaying():
+            try:
+                for op, *args in records:
+                    getattr(backend, op)(*args)
+            except ValueError as ve:
+                # Half replayed (another session changed the same rows since):
+                # the owner's remaining commands no longer fit the tables
+                self.forget(owner)
+                raise ValueError(f"Could not replay '{label}': {ve}") from ve
+
+    def _owner(self):
+        return getattr(self._local, "owner", None)
+
+    def forget(self, owner):
+        """Drops the commands of one owner, e.g. a closed session."""
+        self._undo.pop(owner, None)
+        self._redo.pop(owner, None)
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+
+
+def undoable(label):
+    """
+    Makes a Backend method one undoable command, or part of the command that
+    called it.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            if not self._history.begin(label):
+                return fn(self, *args, **kwargs)
+            try:
+                return fn(self, *args, **kwargs)
+            finally:
+                self._history.end()
+
+        return wrapper
+
+    return decorate
+
+
+class Session:
+    """
+    A Backend as one user (a browser session) sees it: every call runs on
+    behalf of `owner`, so the commands it makes are that owner's and undo,
+    redo and undo_labels only see those. Everything else is the backend's.
+    """
+
+    def __init__(self, backend, owner):
+        self.backend = backend
+        self.owner = owner
+
+    def __getattr__(self, name):
+        value = getattr(self.backend, name)
+        if not callable(value):
+            return value
+
+        @functools.wraps(value)
+        def call(*args, **kwargs):
+            with self.backend._history.acting_as(self.owner):
+                return value(*args, **kwargs)
+
+        return call
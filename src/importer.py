@@ -0,0 +1,149 @@
+import pandas as pd
+
+TURKEY_COLUMNS = ["tid", "weight"]
+ORDER_COLUMNS = ["oid", "target_weight", "name", "ham", "notes"]
+HAM_OPTIONS = {"None", "Whole", "1/2", "1/4"}
+
+# Bad rows beyond this are counted but not listed, to keep memory bounded
+MAX_REPORTED_ERRORS = 1000
+
+
+class ImportReport:
+    """
+    Outcome of a CSV import: how many rows were added and which were rejected.
+    """
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.added = 0
+        self.rejected = 0
+        self.errors = []  # (line number, message), at most MAX_REPORTED_ERRORS
+
+    def reject(self, line, message):
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+    def __str__(self):
+        text = f"Imported {self.added} {self.kind}, rejected {self.rejected} rows."
+        for line, message in self.errors[:10]:
+            text += f"\n  line {line}: {message}"
+        if self.rejected > 10:
+            text += f"\n  ... and {self.rejected - 10} more"
+        return text
+
+
+def sniff_kind(path):
+    """
+    Tells a scale export ("turkeys") from an order sheet ("orders") by its header.
+    """
+    header = pd.read_csv(path, nrows=0, dtype=str).columns.str.strip()
+    if "tid" in header:
+        return "turkeys"
+    if "oid" in header:
+        return "orders"
+    raise ValueError(f"'{path}' has neither a tid nor an oid column!")
+
+
+def read_chunks(path, columns, required, chunksize):
+    """
+    Streams a CSV as string-typed chunks with the file line number of each row.
+
+    Yields:
+        (chunk, lines): the chunk restricted to `columns` and a matching array
+        of line numbers (the header is line 1).
+    """
+    header = pd.read_csv(path, nrows=0, dtype=str).columns.str.strip()
+    missing = [column for column in required if column not in header]
+    if missing:
+        raise ValueError(f"'{path}' is missing the columns {missing}!")
+
+    next_line = 2
+    # Blank lines are read as empty rows, so they still count towards line numbers
+    reader = pd.read_csv(
+        path, dtype=str, keep_default_na=False, chunksize=chunksize, skipinitialspace=True, skip_blank_lines=False
+    )
+    for chunk in reader:
+        # A header-only file still yields one empty chunk
+        if chunk.empty:
+            continue
+        chunk.columns = chunk.columns.str.strip()
+        # A quoted field with line breaks makes its row span several lines
+        spans = 1 + sum(chunk[column].str.count("\n") for column in chunk.columns)
+        ends = next_line + spans.cumsum()
+        next_line = int(ends.iloc[-1])
+        blank = (chunk.fillna("") == "").all(axis=1)
+        if blank.all():
+            continue
+        chunk = chunk[~blank]
+        lines = (ends - spans)[~blank].tolist()
+        for column in columns:
+            if column not in chunk.columns:
+                chunk[column] = ""
+        yield chunk[columns], lines
+
+
+def parse_turkeys(chunk, lines, exists, report):
+    """
+    Validates one chunk of turkeys; bad rows go to the report.
+
+    Returns:
+        list: (tid, weight) for every good row.
+    """
+    tids = _to_int(chunk["tid"])
+    weights = pd.to_numeric(chunk["weight"], errors="coerce")
+
+    good = []
+    seen = set()
+    for line, raw_tid, tid, weight in zip(lines, chunk["tid"], tids, weights):
+        if pd.isna(tid):
+            report.reject(line, f"tid {raw_tid!r} is not a whole number")
+            continue
+        tid = int(tid)
+        if pd.isna(weight) or weight <= 0:
+            report.reject(line, f"weight for turkey {tid} is not a positive number")
+        elif tid in seen or exists(tid):
+            report.reject(line, f"turkey {tid} already exists")
+        else:
+            seen.add(tid)
+            good.append((tid, float(weight)))
+    return good
+
+
+def parse_orders(chunk, lines, exists, report):
+    """
+    Validates one chunk of orders; bad rows go to the report.
+
+    Returns:
+        list: (oid, target_weight, name, ham, notes) for every good row.
+    """
+    oids = _to_int(chunk["oid"])
+    # A blank target weight means a ham-only order, as in the order form
+    targets = pd.to_numeric(chunk["target_weight"].replace("", "0"), errors="coerce")
+    hams = chunk["ham"].replace("", "None")
+
+    good = []
+    seen = set()
+    for line, raw_oid, oid, target, name, ham, notes in zip(
+        lines, chunk["oid"], oids, targets, chunk["name"], hams, chunk["notes"]
+    ):
+        if pd.isna(oid):
+            report.reject(line, f"oid {raw_oid!r} is not a whole number")
+            continue
+        oid = int(oid)
+        if pd.isna(target) or target < 0:
+            report.reject(line, f"target weight for order {oid} is not a number >= 0")
+        elif ham not in HAM_OPTIONS:
+            report.reject(line, f"ham {ham!r} for order {oid} is not one of {sorted(HAM_OPTIONS)}")
+        elif oid in seen or exists(oid):
+            report.reject(line, f"order {oid} already exists")
+        else:
+            seen.add(oid)
+            good.append((oid, float(target), name, ham, notes))
+    return good
+
+
+def _to_int(values):
+    numbers = pd.to_numeric(values, errors="coerce")
+    # 12.0 is fine, 12.5 is not
+    return numbers.where(numbers == numbers.round())
@@ -0,0 +1,187 @@
+import csv
+import os
+import shutil
+
+try:
+    import fcntl
+except ImportError:
+    # Windows has no fcntl; msvcrt locks a byte range instead
+    fcntl = None
+    import msvcrt
+
+from snapshot import load_tables, save_tables
+
+def _optional(decode):
+    # None is written as an empty field
+    return lambda value: None if value == "" else decode(value)
+
+
+# How to turn a journal row back into Backend call arguments
+_DECODERS = {
+    "add_turkey": (int, float),
+    "add_order": (int, float, str, str, str),
+    "match": (int, int),
+    "remove_match_by_oid": (int,),
+    "remove_match_by_tid": (int,),
+    "remove_order": (int,),
+    "remove_turkey": (int,),
+    "constrain_order": (int, _optional(float), _optional(float), _optional(int)),
+}
+
+
+class Journal:
+    """
+    Append-only log of Backend mutations, compacted into snapshots.
+
+    Every mutation is one row appended to journal.csv ("seq,op,args..."), so a
+    click never costs more than a single small write. Once the journal holds
+    `snapshot_every` records the tables are written to a new snapshot directory,
+    CURRENT is pointed at it and the journal starts over. On startup the
+    latest snapshot (binary, see snapshot.py) is loaded and only the records
+    after it are replayed.
+
+    Only one Journal may have a directory open at a time: each keeps its own
+    seq and compacts on its own, so a second writer would truncate the
+    journal and delete the snapshot under the first. The directory is locked
+    for as long as the journal is open.
+    """
+
+    def __init__(self, directory, snapshot_every=5000):
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.seq = 0            # seq of the last record written
+        self.snapshot_seq = 0   # seq covered by the current snapshot
+        self._file = None
+        self._writer = None
+        os.makedirs(directory, exist_ok=True)
+        self._lock_file = self._lock(os.path.join(directory, "LOCK"))
+
+    @staticmethod
+    def _lock(path):
+        # Held until close() or the process exits; the OS drops it on a crash
+        f = open(path, "a+")
+        try:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            f.close()
+            raise ValueError(
+                f"'{os.path.dirname(path)}' is already open in another window or process! Close it there first."
+            )
+        return f
+
+    @property
+    def journal_path(self):
+        return os.path.join(self.directory, "journal.csv")
+
+    @property
+    def current_path(self):
+        return os.path.join(self.directory, "CURRENT")
+
+    def _snapshot_dir(self, seq):
+        return os.path.join(self.directory, f"snapshot-{seq}")
+
+    # --- Startup ---
+    def restore(self, backend):
+        """
+        Loads the latest snapshot into `backend`, replays the journal tail and
+        opens the journal for appending.
+        """
+        if os.path.exists(self.current_path):
+            with open(self.current_path) as f:
+                self.snapshot_seq = int(f.read().strip())
+            backend._load_tables(self._read_snapshot(self._snapshot_dir(self.snapshot_seq)))
+        self.seq = self.snapshot_seq
+
+        if os.path.exists(self.journal_path):
+            self._drop_torn_record()
+            with open(self.journal_path, newline="") as f:
+                rows = list(csv.reader(f))
+            for line, row in enumerate(rows, start=1):
+                try:
+                    seq = int(row[0])
+                    op = row[1]
+                    decoders = _DECODERS[op]
+                    if len(row) - 2 != len(decoders):
+                        raise ValueError(f"Wrong number of arguments for {op}")
+                    args = [decode(value) for decode, value in zip(decoders, row[2:])]
+                except (IndexError, KeyError, ValueError):
+                    raise ValueError(f"Corrupt journal record on line {line} of {self.journal_path}!")
+                # Records already folded into the snapshot are skipped
+                if seq > self.snapshot_seq:
+                    getattr(backend, op)(*args)
+                    self.seq = seq
+
+        self._file = open(self.journal_path, "a", newline="")
+        self._writer = csv.writer(self._file)
+
+    def _drop_torn_record(self):
+        # A crash mid-write leaves a last record without its "\r\n" ending; cut
+        # it off so the next append starts on a fresh line
+        with open(self.journal_path, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\r\n"):
+                end = data.rfind(b"\r\n")
+                f.truncate(end + 2 if end >= 0 else 0)
+
+    # --- Writing ---
+    def append(self, op, *args):
+        self.append_many([(op, *args)])
+
+    def append_many(self, records):
+        """
+        Appends one journal row per (op, *args) record with a single write.
+        """
+        for op, *args in records:
+            self.seq += 1
+            self._writer.writerow([self.seq, op, *args])
+        self._file.flush()
+
+    def needs_compaction(self):
+        return self.seq - self.snapshot_seq >= self.snapshot_every
+
+    def compact(self, backend):
+        """
+        Writes a snapshot of the backend's tables and empties the journal.
+        """
+        if self.seq == self.snapshot_seq:
+            # Never rewrite the snapshot CURRENT points at; move to a new seq
+            self.seq += 1
+        seq = self.seq
+        snapshot_dir = self._snapshot_dir(seq)
+        self._write_snapshot(snapshot_dir, backend._tables())
+
+        # Switch CURRENT atomically; until then the old snapshot + journal stay valid
+        tmp_path = self.current_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(str(seq))
+        os.replace(tmp_path, self.current_path)
+
+        old_seq, self.snapshot_seq = self.snapshot_seq, seq
+        self._file.close()
+        self._file = open(self.journal_path, "w", newline="")
+        self._writer = csv.writer(self._file)
+        if old_seq != seq:
+            shutil.rmtree(self._snapshot_dir(old_seq), ignore_errors=True)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._lock_file is not None:
+            # Closing the file releases the lock
+            self._lock_file.close()
+            self._lock_file = None
+
+    # --- Snapshot files ---
+    @staticmethod
+    def _write_snapshot(snapshot_dir, tables):
+        save_tables(snapshot_dir, tables)
+
+    @staticmethod
+    def _read_snapshot(snapshot_dir):
+        tables, _ = load_tables(snapshot_dir, ["orders", "turkeys", "constraints"])
+        return tables
@@ -1,11 +1,74 @@
-import flet as ft
-import pandas as pd
-from backend import Backend
-from turkey_manager import TurkeyManager
+import os
+import threading
+import time
+
+# Startup is timed from here, before the UI toolkit loads
+_started = time.perf_counter()
+
+import flet as ft  # noqa: E402
+from metrics import configure as configure_logging, log  # noqa: E402
+
+# pandas, numpy and fpdf are not imported here: the backend, the tables and
+# the reports load them only after the first frame is on screen.
+
+# Seconds from startup to the first frame (see benchmarks/startup.py)
+FIRST_FRAME_BUDGET = 1.5
+
+# One backend for the whole process, so in web mode every browser session
+# works on the same season
+_backend = None
+_backend_lock = threading.Lock()
+# Latest Backend.version announced to the other sessions
+_announced_version = 0
+
+
+def shared_backend():
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            from backend import Backend
+
+            # Season data is journaled to disk so it survives restarts
+            data_dir = os.getenv("FLET_APP_STORAGE_DATA", os.path.join(os.path.expanduser("~"), ".turkeys"))
+            _backend = Backend(csv=os.path.join(data_dir, "season"))
+        return _backend
+
 
 def main(page: ft.Page):
-    backend = Backend()
-    turkey_manager = TurkeyManager(backend, lambda: refresh_ui())
+    # Logs stay quiet unless TURKEYS_LOG is set (e.g. INFO or DEBUG)
+    configure_logging()
+
+    # First frame: only Flet is loaded so far, so this shows almost at once
+    loading = ft.Row(
+        [ft.ProgressRing(), ft.Text("Loading season…")],
+        alignment=ft.MainAxisAlignment.CENTER,
+        expand=True,
+    )
+    page.add(loading)
+    if _backend is None:
+        first_frame = time.perf_counter() - _started
+        if first_frame > FIRST_FRAME_BUDGET:
+            log.warning("First frame after %.2fs, over the %.2fs budget", first_frame, FIRST_FRAME_BUDGET)
+        else:
+            log.info("First frame after %.2fs", first_frame)
+
+    # The heavy modules load behind the loading indicator
+    from tables import ROWS_PER_PAGE, TableView, order_cells, turkey_cells
+    from turkey_manager import TurkeyManager
+
+    try:
+        backend = shared_backend()
+    except ValueError as ve:
+        # e.g. the season is already open in another window
+        log.error("%s", ve)
+        page.controls.remove(loading)
+        page.add(ft.Text(str(ve), color=ft.Colors.RED))
+        return
+    page.controls.remove(loading)
+    # Each browser undoes only its own commands
+    turkey_manager = TurkeyManager(
+        backend.session(page.session_id), lambda: refresh_ui(), lambda table, old, new: select_row(table, old, new)
+    )
 
     # --- Sort state ---
     turkey_sort_col = "tid"
@@ -13,35 +76,38 @@ def main(page: ft.Page):
     order_sort_col = "oid"
     order_sort_asc = True
 
-    # --- Header arrows helper ---
-    def arrow(col, current_col, asc):
-        if col == current_col:
-            return "↑" if asc else "↓"
-        return ""
+    # --- Header labels: (sort key, label); sort arrows are added by the view ---
+    turkey_headers = [("tid", "TID"), ("weight", "Weight"), (None, "Assigned")]
+    order_headers = [
+        ("oid", "OID"), ("name", "Name"), ("target_weight", "Target"),
+        (None, "Ham"), (None, "Matched"), (None, "Weight"), (None, "Notes"), (None, "Range"),
+    ]
 
     # --- DataTables ---
     turkey_table = ft.DataTable(
         columns=[
-            ft.DataColumn(ft.Text(f"TID {arrow('tid', turkey_sort_col, turkey_sort_asc)}"), on_sort=lambda e: sort_turkeys("tid")),
-            ft.DataColumn(ft.Text(f"Weight {arrow('weight', turkey_sort_col, turkey_sort_asc)}"), on_sort=lambda e: sort_turkeys("weight")),
-            ft.DataColumn(ft.Text("Assigned")),
+            ft.DataColumn(ft.Text(label), on_sort=(lambda e, key=key: sort_turkeys(key)) if key else None)
+            for key, label in turkey_headers
         ],
         rows=[]
     )
 
     order_table = ft.DataTable(
         columns=[
-            ft.DataColumn(ft.Text(f"OID {arrow('oid', order_sort_col, order_sort_asc)}"), on_sort=lambda e: sort_orders("oid")),
-            ft.DataColumn(ft.Text(f"Name {arrow('name', order_sort_col, order_sort_asc)}"), on_sort=lambda e: sort_orders("name")),
-            ft.DataColumn(ft.Text(f"Target {arrow('target_weight', order_sort_col, order_sort_asc)}"), on_sort=lambda e: sort_orders("target_weight")),
-            ft.DataColumn(ft.Text("Ham")),
-            ft.DataColumn(ft.Text("Matched")),
-            ft.DataColumn(ft.Text("Weight")),
-            ft.DataColumn(ft.Text("Notes")),
+            ft.DataColumn(ft.Text(label), on_sort=(lambda e, key=key: sort_orders(key)) if key else None)
+            for key, label in order_headers
         ],
         rows=[]
     )
 
+    # Rows are patched in place instead of rebuilt on every refresh
+    # and only one page of each table is materialized
+    turkey_view = TableView(turkey_table, turkey_cells, lambda tid: turkey_manager.select_turkey(tid), ROWS_PER_PAGE, lambda: refresh_ui())
+    order_view = TableView(
+        order_table, lambda oid, o: order_cells(oid, o, backend.constraints(oid)),
+        lambda oid: turkey_manager.select_order(oid), ROWS_PER_PAGE, lambda: refresh_ui(),
+    )
+
     # --- Sort functions ---
     def sort_turkeys(col):
         nonlocal turkey_sort_col, turkey_sort_asc
@@ -61,94 +127,89 @@ def main(page: ft.Page):
             order_sort_asc = True
         refresh_ui()
 
+    # --- Selection: only the two affected rows change ---
+    def select_row(table, old, new):
+        view = turkey_view if table == "turkeys" else order_view
+        view.select(old, new)
+
     # --- Refresh function ---
+    # Backend.version this session last drew, and the search it showed
+    synced_version = None
+    shown_query = ""
+    # One refresh at a time per session, so an older one never draws over a newer one
+    refresh_lock = threading.RLock()
+
     def refresh_ui():
-        nonlocal turkey_table, order_table
-
-        # --- Update turkey table ---
-        df_turkeys = turkey_manager.get_sorted_turkeys().sort_values(
-            turkey_sort_col, ascending=turkey_sort_asc
-        )
-        turkey_table.rows.clear()
-        for tid, t in df_turkeys.to_dict("index").items():
-            assigned_text = "Yes" if t["assigned"] else "No"
-            assigned_color = ft.Colors.GREEN if t["assigned"] else ft.Colors.RED
-            turkey_table.rows.append(
-                ft.DataRow(
-                    cells=[
-                        ft.DataCell(ft.Text(str(tid))),
-                        ft.DataCell(ft.Text(str(t["weight"]))),
-                        ft.DataCell(ft.Text(assigned_text, color=assigned_color)),
-                    ],
-                    selected=(tid == turkey_manager.selected_turkey),
-                    on_select_changed=lambda e, tid=tid: turkey_manager.select_turkey(tid),
-                )
-            )
-
-        # Rebuild columns with updated arrows
-        turkey_table.columns = [
-            ft.DataColumn(
-                ft.Text(f"TID {arrow('tid', turkey_sort_col, turkey_sort_asc)}"),
-                on_sort=lambda e: sort_turkeys("tid")
-            ),
-            ft.DataColumn(
-                ft.Text(f"Weight {arrow('weight', turkey_sort_col, turkey_sort_asc)}"),
-                on_sort=lambda e: sort_turkeys("weight")
-            ),
-            ft.DataColumn(ft.Text("Assigned")),
-        ]
-        turkey_table.update()
-
-        # --- Update order table ---
-        df_orders = turkey_manager.get_sorted_orders().sort_values(
-            order_sort_col, ascending=order_sort_asc
-        )
-        order_table.rows.clear()
-        for oid, o in df_orders.to_dict("index").items():
-            assigned_tid = str(o["assigned_tid"]) if pd.notna(o["assigned_tid"]) else "No"
-            assigned_tid_color = ft.Colors.GREEN if pd.notna(o["assigned_tid"]) else ft.Colors.RED
-
-            assigned_weight = str(o["assigned_weight"]) if pd.notna(o["assigned_weight"]) else "No"
-            assigned_weight_color = ft.Colors.GREEN if pd.notna(o["assigned_weight"]) else ft.Colors.RED
-
-            order_table.rows.append(
-                ft.DataRow(
-                    cells=[
-                        ft.DataCell(ft.Text(str(oid))),
-                        ft.DataCell(ft.Text(o["name"])),
-                        ft.DataCell(ft.Text(str(o["target_weight"]))),
-                        ft.DataCell(ft.Text(o["ham"])),
-                        ft.DataCell(ft.Text(assigned_tid, color=assigned_tid_color)),
-                        ft.DataCell(ft.Text(assigned_weight, color=assigned_weight_color)),
-                        ft.DataCell(ft.Text(o["notes"])),
-                    ],
-                    selected=(oid == turkey_manager.selected_order),
-                    on_select_changed=lambda e, oid=oid: turkey_manager.select_order(oid),
-                )
-            )
-
-        # Rebuild order table headers with arrows
-        order_table.columns = [
-            ft.DataColumn(
-                ft.Text(f"OID {arrow('oid', order_sort_col, order_sort_asc)}"),
-                on_sort=lambda e: sort_orders("oid")
-            ),
-            ft.DataColumn(
-                ft.Text(f"Name {arrow('name', order_sort_col, order_sort_asc)}"),
-                on_sort=lambda e: sort_orders("name")
-            ),
-            ft.DataColumn(
-                ft.Text(f"Target {arrow('target_weight', order_sort_col, order_sort_asc)}"),
-                on_sort=lambda e: sort_orders("target_weight")
-            ),
-            ft.DataColumn(ft.Text("Ham")),
-            ft.DataColumn(ft.Text("Matched")),
-            ft.DataColumn(ft.Text("Weight")),
-            ft.DataColumn(ft.Text("Notes")),
-        ]
-        order_table.update()
+        global _announced_version
+        nonlocal synced_version, shown_query
+        with refresh_lock:
+            # Read everything under the shared lock, send nothing: a slow
+            # browser must not stall the other sessions' edits
+            with backend.lock:
+                # Rows changed by any session since this one last drew
+                changed = backend.changes_since(synced_version) if synced_version is not None else None
+                turkey_changed = order_changed = None
+                if changed is not None:
+                    turkey_changed = {key for table, key in changed if table == "turkeys"}
+                    order_changed = {key for table, key in changed if table == "orders"}
+
+                # Another session may have deleted the selection
+                if turkey_manager.selected_turkey not in backend.table("turkeys"):
+                    turkey_manager.selected_turkey = None
+                if turkey_manager.selected_order not in backend.table("orders"):
+                    turkey_manager.selected_order = None
+
+                # --- Turkey rows ---
+                tids = turkey_manager.sorted_turkey_ids(turkey_sort_col, turkey_sort_asc)
+                turkey_rows = turkey_view.prepare(backend.table("turkeys"), tids, turkey_changed)
+
+                # --- Order rows ---
+                oids = turkey_manager.filter_orders(turkey_manager.sorted_order_ids(order_sort_col, order_sort_asc))
+                if turkey_manager.search_input.value != shown_query:
+                    # A new search starts on its first page of hits
+                    shown_query = turkey_manager.search_input.value
+                    order_view.page = 0
+                order_rows = order_view.prepare(backend.table("orders"), oids, order_changed)
+
+                synced_version = backend.version
+                announce = synced_version > _announced_version
+                if announce:
+                    _announced_version = synced_version
+
+            turkey_view.set_headers(turkey_headers, turkey_sort_col, turkey_sort_asc)
+            turkey_view.show(turkey_rows, turkey_manager.selected_turkey)
+            order_view.set_headers(order_headers, order_sort_col, order_sort_asc)
+            order_view.show(order_rows, turkey_manager.selected_order)
+
+        turkey_manager.update_suggestions()
+        turkey_manager.update_stats()
+        turkey_manager.update_undo_buttons()
+        turkey_manager.update_dashboard()
+        if announce:
+            # The other sessions pick the rows that changed from the backend's change log
+            page.pubsub.send_others(synced_version)
+
+    def on_backend_changed(version):
+        if version != synced_version:
+            refresh_ui()
+
+    page.pubsub.subscribe(on_backend_changed)
+    page.on_close = lambda e: backend.end_session(page.session_id)
+
+    def on_keyboard(e: ft.KeyboardEvent):
+        # Ctrl+Z undoes, Ctrl+Y or Ctrl+Shift+Z redoes
+        if not (e.ctrl or e.meta):
+            return
+        if e.key == "Z" and not e.shift:
+            turkey_manager.undo()
+        elif e.key == "Y" or (e.key == "Z" and e.shift):
+            turkey_manager.redo()
+
+    page.on_keyboard_event = on_keyboard
 
     # --- Layout ---
+    page.overlay.append(turkey_manager.import_picker)
+    page.overlay.append(turkey_manager.stats_overlay)
     page.add(
         ft.Row(
             [
@@ -156,11 +217,14 @@ def main(page: ft.Page):
                     [
                         ft.Row([turkey_manager.tid_input, turkey_manager.weight_input], spacing=10,alignment=ft.MainAxisAlignment.CENTER,),
                         ft.Row([turkey_manager.add_turkey_btn, turkey_manager.delete_turkey_btn], spacing=10,alignment=ft.MainAxisAlignment.CENTER,),
+                        ft.Row([turkey_manager.live_checkbox, turkey_manager.swaps_checkbox], spacing=10,alignment=ft.MainAxisAlignment.CENTER,),
+                        turkey_manager.live_status,
                         ft.Container(
                             content=ft.Column([turkey_table], expand=True, scroll=ft.ScrollMode.AUTO),
                             expand=True,
                             padding=5,
                         ),
+                        turkey_view.pager,
                     ],
                     expand=False,
                     spacing=10,
@@ -169,11 +233,19 @@ def main(page: ft.Page):
                 ),
                 ft.Column(
                     [
+                        turkey_manager.match_strategy_dropdown,
+                        turkey_manager.tolerance_input,
                         turkey_manager.auto_match_btn,
+                        turkey_manager.match_status,
+                        ft.Row([turkey_manager.undo_btn, turkey_manager.redo_btn], spacing=10, alignment=ft.MainAxisAlignment.CENTER),
                         turkey_manager.match_btn,
                         turkey_manager.unmatch_turkey_btn,
                         turkey_manager.unmatch_order_btn,
                         turkey_manager.make_pdfs_btn,
+                        turkey_manager.tickets_btn,
+                        turkey_manager.import_btn,
+                        turkey_manager.import_status,
+                        turkey_manager.dashboard_panel,
                     ],
                     expand=False,
                     spacing=10,
@@ -185,11 +257,15 @@ def main(page: ft.Page):
                         ft.Row([turkey_manager.oid_input, turkey_manager.order_name_input,turkey_manager.target_weight_input], spacing=10,alignment=ft.MainAxisAlignment.CENTER,),
                         ft.Row([turkey_manager.notes_input, turkey_manager.ham_radio_group], spacing=10,alignment=ft.MainAxisAlignment.CENTER,),
                         ft.Row([turkey_manager.add_order_btn, turkey_manager.delete_order_btn], spacing=10,alignment=ft.MainAxisAlignment.CENTER,),
+                        ft.Row([turkey_manager.min_weight_input, turkey_manager.max_weight_input, turkey_manager.priority_input, turkey_manager.constrain_order_btn], spacing=10,alignment=ft.MainAxisAlignment.CENTER,),
+                        turkey_manager.suggestions_row,
+                        turkey_manager.search_input,
                         ft.Container(
                             content=ft.Column([order_table], expand=True, scroll=ft.ScrollMode.AUTO),
                             expand=True,
                             padding=5,
                         ),
+                        order_view.pager,
                     ],
                     expand=True,
                     spacing=10,
@@ -204,7 +280,9 @@ def main(page: ft.Page):
 
     refresh_ui()
 
-ft.app(target=main)
+# Report workers re-import this module; only the real entry point starts the app
+if __name__ == "__main__":
+    ft.app(target=main)
 
 
 
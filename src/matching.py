@@ -0,0 +1,401 @@
+import bisect
+import heapq
+import itertools
+import math
+
+import numpy as np
+
+STRATEGIES = ("greedy", "min_total", "min_max", "constrained")
+
+# Acceptable deviation either side of the target, for orders without a range
+DEFAULT_TOLERANCE = 2.0
+# Staff mark an order as urgent by starting its notes with this
+PRIORITY_FLAG = "!"
+
+_MUST = 0
+_OPTIONAL = 1
+
+
+def optimal_pairs(order_weights, turkey_weights, strategy="min_total"):
+    """
+    Pairs orders with turkeys so the weight deviation is globally optimal.
+
+    As many pairs as possible are made (the smaller of the two sides is matched
+    completely). Runs in O(n log n).
+
+    Args:
+        order_weights: target weights of the orders to fill.
+        turkey_weights: weights of the free turkeys.
+        strategy (str): "min_total" minimises the summed absolute deviation,
+            "min_max" minimises the largest single deviation.
+
+    Returns:
+        (order_idx, turkey_idx): positions into the two inputs, one entry per pair.
+    """
+    if strategy not in ("min_total", "min_max"):
+        raise ValueError(f"Unknown matching strategy {strategy!r}!")
+
+    orders = np.asarray(order_weights, dtype=float)
+    turkeys = np.asarray(turkey_weights, dtype=float)
+    order_sort = np.argsort(orders, kind="stable")
+    turkey_sort = np.argsort(turkeys, kind="stable")
+
+    # The shorter side is matched completely; the longer side chooses who is used
+    swap = len(orders) > len(turkeys)
+    if swap:
+        must, optional = turkeys[turkey_sort], orders[order_sort]
+    else:
+        must, optional = orders[order_sort], turkeys[turkey_sort]
+
+    if len(must) == 0:
+        empty = np.array([], dtype=int)
+        return empty, empty
+
+    if strategy == "min_total":
+        optional_idx = np.flatnonzero(_min_total_subset(must, optional))
+    else:
+        optional_idx = _min_max_positions(must, optional)
+    must_idx = np.arange(len(must))
+
+    # Both sides are sorted, so the i-th must pairs with the i-th chosen optional
+    if swap:
+        return order_sort[optional_idx], turkey_sort[must_idx]
+    return order_sort[must_idx], turkey_sort[optional_idx]
+
+
+def _min_total_subset(must, optional):
+    # Min-cost flow along the weight line: f is the number of items still
+    # travelling right past the current point, g(f) the cheapest prefix cost.
+    # g is convex and piecewise linear, kept as two heaps of (breakpoint, slope
+    # change) ("slope trick"); positions are shifted lazily by the offsets.
+    positions = np.concatenate([must, optional])
+    kinds = np.concatenate([np.full(len(must), _MUST), np.full(len(optional), _OPTIONAL)])
+    ids = np.concatenate([np.arange(len(must)), np.arange(len(optional))])
+    order = np.lexsort((kinds, positions))
+    events = list(zip(positions[order].tolist(), kinds[order].tolist(), ids[order].tolist()))
+
+    left = [(0, float("inf"))]   # max-heap: (-(position - left_shift), weight)
+    right = [(0, float("inf"))]  # min-heap: (position - right_shift, weight)
+    left_shift = right_shift = 0
+    threshold = [0] * len(optional)
+
+    prev = events[0][0]
+    for pos, kind, idx in events:
+        gap = pos - prev
+        prev = pos
+        if gap > 0:
+            # g(f) += gap * max(0, f)
+            if -left[0][0] + left_shift <= 0:
+                heapq.heappush(right, (-right_shift, gap))
+            else:
+                heapq.heappush(left, (left_shift, gap))
+                _move_weight(left, right, gap, lambda p: -p + left_shift, lambda x: x - right_shift)
+            # g(f) += gap * max(0, -f)
+            if right[0][0] + right_shift >= 0:
+                heapq.heappush(left, (left_shift, gap))
+            else:
+                heapq.heappush(right, (-right_shift, gap))
+                _move_weight(right, left, gap, lambda p: p + right_shift, lambda x: -(x - left_shift))
+
+        if kind == _MUST:
+            # g'(f) = g(f - 1)
+            left_shift += 1
+            right_shift += 1
+        else:
+            # g'(f) = min(g(f), g(f + 1)); remember where g stops decreasing
+            threshold[idx] = -left[0][0] + left_shift
+            left_shift -= 1
+
+    # Walk back from f = 0 at the far end, choosing the cheaper state at each point
+    used = np.zeros(len(optional), dtype=bool)
+    flow = 0
+    for _, kind, idx in reversed(events):
+        if kind == _MUST:
+            flow -= 1
+        elif flow < threshold[idx]:
+            used[idx] = True
+            flow += 1
+    return used
+
+
+def _move_weight(src, dst, amount, src_position, dst_key):
+    # Move `amount` of slope from the top of one heap to the other
+    while amount > 0:
+        key, weight = heapq.heappop(src)
+        position = src_position(key)
+        if weight > amount:
+            heapq.heappush(src, (key, weight - amount))
+            heapq.heappush(dst, (dst_key(position), amount))
+            return
+        heapq.heappush(dst, (dst_key(position), weight))
+        amount -= weight
+
+
+def _min_max_positions(must, optional):
+    # Bisect on the allowed deviation; the sorted greedy decides feasibility
+    low = 0.0
+    high = max(must[-1], optional[-1]) - min(must[0], optional[0]) + 1.0
+    best = _bottleneck_positions(must, optional, high)
+    for _ in range(100):
+        if high - low <= 1e-9:
+            break
+        mid = (low + high) / 2
+        positions = _bottleneck_positions(must, optional, mid)
+        if positions is None:
+            low = mid
+        else:
+            high, best = mid, positions
+    return best
+
+
+def _bottleneck_positions(must, optional, limit):
+    # Give each item (ascending) the lightest unused partner >= weight - limit;
+    # that partner index is a running max, so the whole sweep vectorises
+    steps = np.arange(len(must))
+    lowest = np.searchsorted(optional, must - limit, side="left")
+    positions = np.maximum.accumulate(lowest - steps) + steps
+    if positions[-1] >= len(optional):
+        return None
+    if np.any(optional[positions] > must + limit):
+        return None
+    return positions
+
+
+def default_priority(ham, notes):
+    """
+    The tier of an order without an explicit priority: flagged notes first,
+    then ham orders, then the rest. Lower tiers are served first.
+    """
+    if isinstance(notes, str) and notes.startswith(PRIORITY_FLAG):
+        return 0
+    if isinstance(ham, str) and ham != "None":
+        return 1
+    return 2
+
+
+def constrained_pairs(lows, highs, tiers, turkey_weights):
+    """
+    Pairs orders with turkeys inside each order's acceptable weight range.
+
+    Tiers are served in turn, lowest first, and each tier fills as many of its
+    orders as it can without unmatching any order of an earlier tier (those
+    may be moved to another turkey in their range to make room). Within a
+    tier, orders closing soonest (lowest max weight) first take the lightest
+    free turkey in their range; the orders left over then look for augmenting
+    paths (take a turkey whose order moves to another turkey, and so on until
+    a free one is reached), which makes the count of each tier maximal. No
+    turkey is ever assigned outside an order's range.
+
+    Runs in O(n log n) per tier plus O(log n) per step a path search grows;
+    the turkeys a failed search reached are never searched again.
+
+    Args:
+        lows, highs: acceptable weight range of every order (inclusive).
+        tiers: priority tier of every order.
+        turkey_weights: weights of the free turkeys.
+
+    Returns:
+        (order_idx, turkey_idx, unmatched): positions of the pairs, and
+        (order position, reason) for every order left without a turkey.
+    """
+    lows = np.asarray(lows, dtype=float)
+    highs = np.asarray(highs, dtype=float)
+    tiers = np.asarray(tiers)
+    turkeys = np.asarray(turkey_weights, dtype=float)
+    turkey_sort = np.argsort(turkeys, kind="stable")
+    weights = turkeys[turkey_sort]
+
+    # Sorted turkeys in each order's range: [first, stop)
+    first = np.searchsorted(weights, lows, side="left").tolist()
+    stop = np.searchsorted(weights, highs, side="right").tolist()
+    # The order holding each sorted turkey and the turkey held by each order, or -1
+    holder = [-1] * len(weights)
+    held = [-1] * len(lows)
+    # Next free sorted turkey at or after a position
+    next_free = list(range(len(weights) + 1))
+
+    unmatched = []
+    # One sort serves the tiers in turn, soonest closing first within each
+    by_tier = np.lexsort((np.arange(len(lows)), highs, tiers)).tolist()
+    for start, end in _runs([tiers[i] for i in by_tier]):
+        waiting = []
+        for i in by_tier[start:end]:
+            if lows[i] > highs[i]:
+                unmatched.append((i, "empty weight range"))
+                continue
+            if first[i] == stop[i]:
+                unmatched.append((i, f"no turkey {_window(lows[i], highs[i])}"))
+                continue
+            position = _find(next_free, first[i])
+            if position < stop[i]:
+                next_free[position] = position + 1
+                holder[position] = i
+                held[i] = position
+            else:
+                waiting.append(i)
+        if not waiting:
+            continue
+
+        failed = _augment(waiting, first, stop, holder, held, next_free)
+        # Turkeys held by this tier, counted up to each position
+        tier = tiers[by_tier[start]]
+        this_tier = [0, *itertools.accumulate(int(i != -1 and tiers[i] == tier) for i in holder)]
+        for i, low, high in failed:
+            # The orders holding the turkeys the search reached are the ones
+            # that could give theirs up; from an earlier tier, they need them
+            window = _window(lows[i], highs[i])
+            if this_tier[high] == this_tier[low]:
+                unmatched.append((i, f"the turkeys {window} went to higher-priority orders"))
+            else:
+                unmatched.append((i, f"the turkeys {window} went to other orders of the same priority"))
+
+    order_idx = [i for i in by_tier if held[i] != -1]
+    turkey_idx = [int(turkey_sort[held[i]]) for i in order_idx]
+    return np.array(order_idx, dtype=int), np.array(turkey_idx, dtype=int), unmatched
+
+
+def _runs(values):
+    # (start, end) of every run of equal values
+    start = 0
+    for end in range(1, len(values) + 1):
+        if end == len(values) or values[end] != values[start]:
+            yield start, end
+            start = end
+
+
+def _find(parents, position):
+    # Union-find root with path halving: the next unmarked position at or after
+    while parents[position] != position:
+        parents[position] = parents[parents[position]]
+        position = parents[position]
+    return position
+
+
+def _augment(waiting, first, stop, holder, held, next_free):
+    # Looks for an augmenting path from each waiting order in turn. Every order
+    # on a path holds a turkey inside the range of the order before it, so the
+    # turkeys a search can reach are one run [low, high) of sorted positions:
+    # it starts as the order's range and grows by the widest range of the
+    # orders holding turkeys in it, until a free turkey falls inside. The order
+    # that grew the run over a turkey is the one to move onto it.
+    # A failed search's run is closed (no order in it reaches out), so it is
+    # never searched through again. Returns (order, low, high) per failure.
+    none = (-math.inf, -1)
+    reach_up = _MaxTree([(stop[i], position) if i != -1 else none for position, i in enumerate(holder)])
+    reach_down = _MaxTree([(-first[i], position) if i != -1 else none for position, i in enumerate(holder)])
+    dead = list(range(len(holder) + 1))
+
+    def place(i, position):
+        holder[position] = i
+        held[i] = position
+        reach_up.set(position, (stop[i], position))
+        reach_down.set(position, (-first[i], position))
+
+    failed = []
+    for root in waiting:
+        low, high = first[root], stop[root]
+        # Who grew the run over each part: [start, stop) -> order, above and below the root's range
+        up_starts, up_orders, down_stops, down_orders = [], [], [], []
+        widest_up, widest_down = reach_up.max(low, high), reach_down.max(low, high)
+        while True:
+            position = _find(next_free, low)
+            if position < high:
+                break
+            grew = False
+            if widest_up[0] > high:
+                up_starts.append(high)
+                up_orders.append(holder[widest_up[1]])
+                high, old = widest_up[0], high
+                widest_up = max(widest_up, reach_up.max(old, high))
+                widest_down = max(widest_down, reach_down.max(old, high))
+                grew = True
+            if -widest_down[0] < low:
+                down_stops.append(-low)
+                down_orders.append(holder[widest_down[1]])
+                low, old = -widest_down[0], low
+                widest_up = max(widest_up, reach_up.max(low, old))
+                widest_down = max(widest_down, reach_down.max(low, old))
+                grew = True
+            if not grew:
+                break
+
+        if position >= high:
+            failed.append((root, low, high))
+            position = _find(dead, low)
+            while position < high:
+                dead[position] = position + 1
+                reach_up.set(position, none)
+                reach_down.set(position, none)
+                position = _find(dead, position)
+            continue
+
+        # Walk back from the free turkey, moving each order onto the turkey it grew the run over
+        next_free[position] = position + 1
+        while position != -1:
+            if position >= first[root] and position < stop[root]:
+                i = root
+            elif position >= stop[root]:
+                i = up_orders[bisect.bisect_right(up_starts, position) - 1]
+            else:
+                i = down_orders[bisect.bisect_right(down_stops, -position - 1) - 1]
+            old = held[i]
+            place(i, position)
+            position = old
+    return failed
+
+
+def _window(low, high):
+    if high == float("inf"):
+        return f"from {low:g} lbs"
+    return f"between {low:g} and {high:g} lbs"
+
+
+class _MaxTree:
+    # Segment tree of (value, position) pairs: set one, or the max of a range, in O(log n)
+    def __init__(self, values):
+        self._size = len(values)
+        self._tree = [(-math.inf, -1)] * self._size + list(values)
+        for node in range(self._size - 1, 0, -1):
+            self._tree[node] = max(self._tree[2 * node], self._tree[2 * node + 1])
+
+    def set(self, position, value):
+        node = position + self._size
+        self._tree[node] = value
+        while node > 1:
+            node //= 2
+            self._tree[node] = max(self._tree[2 * node], self._tree[2 * node + 1])
+
+    def max(self, start, stop):
+        best = (-math.inf, -1)
+        start += self._size
+        stop += self._size
+        while start < stop:
+            if start & 1:
+                best = max(best, self._tree[start])
+                start += 1
+            if stop & 1:
+                stop -= 1
+                best = max(best, self._tree[stop])
+            start //= 2
+            stop //= 2
+        return best
+
+
+def match_score(strategy, deviations):
+    """
+    Summarises the quality of an auto match run.
+
+    Args:
+        strategy (str): the strategy that produced the pairs.
+        deviations: absolute weight difference of every pair made.
+
+    Returns:
+        dict: strategy, matched, total_deviation and max_deviation.
+    """
+    deviations = np.asarray(deviations, dtype=float)
+    return {
+        "strategy": strategy,
+        "matched": int(len(deviations)),
+        "total_deviation": float(deviations.sum()) if len(deviations) else 0.0,
+        "max_deviation": float(deviations.max()) if len(deviations) else 0.0,
+    }
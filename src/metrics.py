@@ -0,0 +1,144 @@
+import functools
+import io
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+
+# Quiet by default: only warnings reach stderr until configure() lowers the level
+log = logging.getLogger("turkeys")
+
+_NUMBER = re.compile(r"\d+(\.\d+)?")
+
+
+class Metrics:
+    """
+    Counters and per-operation timers, safe to update from any thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = Counter()
+        self.timers = {}  # operation -> [calls, total seconds, max seconds]
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def record(self, name, seconds):
+        with self._lock:
+            timer = self.timers.get(name)
+            if timer is None:
+                timer = self.timers[name] = [0, 0.0, 0.0]
+            timer[0] += 1
+            timer[1] += seconds
+            timer[2] = max(timer[2], seconds)
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: counters, and calls / total / mean / max seconds per operation.
+        """
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "timers": {
+                    name: {"calls": calls, "total": total, "mean": total / calls, "max": longest}
+                    for name, (calls, total, longest) in self.timers.items()
+                },
+            }
+
+    def summary(self, limit=8):
+        # A few lines for the stats overlay: the slowest operations, then the counters
+        stats = self.snapshot()
+        timers = sorted(stats["timers"].items(), key=lambda item: -item[1]["total"])[:limit]
+        lines = [f"{name:<24}{t['calls']:>7} × {t['mean'] * 1000:8.2f} ms" for name, t in timers]
+        lines += [f"{name}: {n}" for name, n in Counter(stats["counters"]).most_common(limit)]
+        return "\n".join(lines) or "No operations yet."
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.timers.clear()
+
+
+metrics = Metrics()
+
+
+def profiled(fn):
+    """
+    Times every call of a Backend method, and counts the calls rejected with a
+    ValueError by reason.
+    """
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        except ValueError as ve:
+            metrics.count(f"rejected {name}: {reason(ve)}")
+            raise
+        finally:
+            metrics.record(name, time.perf_counter() - start)
+
+    return wrapper
+
+
+def reason(error):
+    # "Order with oid=12 does not exist!" -> "Order with oid=# does not exist!"
+    return _NUMBER.sub("#", str(error))
+
+
+class Profile:
+    """
+    Runs a block under cProfile, for a close look at one slow call:
+
+        with Profile() as profile:
+            backend.auto_match("min_total")
+        print(profile.report())
+    """
+
+    def __init__(self, limit=20):
+        # The profiler modules are only loaded when someone profiles
+        import cProfile
+
+        self.limit = limit
+        self._profiler = cProfile.Profile()
+
+    def __enter__(self):
+        self._profiler.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self._profiler.disable()
+        return False
+
+    def report(self, sort="cumulative"):
+        import pstats
+
+        out = io.StringIO()
+        pstats.Stats(self._profiler, stream=out).sort_stats(sort).print_stats(self.limit)
+        return out.getvalue()
+
+
+def configure(level=None):
+    """
+    Sends the app's log records to stderr.
+
+    Args:
+        level (str): e.g. "INFO" or "DEBUG" (DEBUG also lists every auto match
+            assignment). Defaults to $TURKEYS_LOG; without either, only
+            warnings are shown.
+    """
+    level = level or os.getenv("TURKEYS_LOG")
+    if not level:
+        return
+    if not log.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+        log.addHandler(handler)
+    log.setLevel(level.upper())
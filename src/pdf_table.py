@@ -0,0 +1,214 @@
+import numpy as np
+import pandas as pd
+
+FONT = "Arial"
+TITLE_SIZE = 14
+FONT_SIZE = 12
+CELL_PADDING = 1.5  # mm left and right of the text in a cell
+ELLIPSIS = "..."    # core fonts are Latin-1, so no single-character ellipsis
+
+
+def format_column(values, rows):
+    """
+    Turns a column into display strings in one vectorized step.
+
+    Missing values become "", whole numbers lose their ".0" and characters the
+    core PDF fonts cannot encode become "?".
+
+    Args:
+        values: a Series, or None for a blank column (e.g. for handwriting).
+        rows (int): number of rows, used for blank columns.
+
+    Returns:
+        list: one string per row.
+    """
+    if values is None:
+        return [""] * rows
+
+    missing = values.isna().to_numpy()
+    present = values[~missing]
+    if pd.api.types.is_numeric_dtype(present) and not pd.api.types.is_bool_dtype(present):
+        numbers = present.to_numpy(dtype=float)
+        if np.all(numbers == np.round(numbers)):
+            present = present.astype("int64")
+    text = np.full(len(values), "", dtype=object)
+    text[~missing] = present.astype(str).to_numpy(dtype=object)
+    text = text.tolist()
+
+    joined = "".join(text)
+    if not joined.isascii():
+        # Every unencodable character becomes one "?", so lengths are unchanged
+        safe = joined.encode("latin-1", "replace").decode("latin-1")
+        if safe != joined:
+            ends = np.cumsum([len(item) for item in text]).tolist()
+            text = [safe[start:end] for start, end in zip([0] + ends[:-1], ends)]
+    return text
+
+
+class _Widths:
+    """
+    String widths for the current font, computed for a whole column at once
+    from the font's character width table.
+    """
+
+    def __init__(self, pdf):
+        cw = pdf.current_font.cw
+        self.scale = pdf.font_size / 1000
+        self.table = np.array([cw.get(chr(code), 0) for code in range(256)], dtype=np.float64) * self.scale
+
+    def cumulative(self, text):
+        # Width of "".join(text)[:i] for every i
+        codes = np.frombuffer("".join(text).encode("latin-1"), dtype=np.uint8)
+        return np.concatenate(([0.0], np.cumsum(self.table[codes])))
+
+    def of(self, text):
+        """
+        Returns:
+            (widths, cumulative, starts): the width of every string, plus the
+            running widths and string offsets, which _fit uses to cut strings.
+        """
+        cumulative = self.cumulative(text)
+        lengths = np.fromiter(map(len, text), dtype=np.int64, count=len(text))
+        starts = np.cumsum(lengths) - lengths
+        return cumulative[starts + lengths] - cumulative[starts], cumulative, starts
+
+
+def _fit(text, widths, cumulative, starts, room, ellipsis_width):
+    """
+    Cuts the strings wider than `room` and ends them with an ellipsis.
+    Only the overflowing rows are touched.
+    """
+    for row in np.flatnonzero(widths > room).tolist():
+        start = starts[row]
+        # Longest prefix that still fits together with the ellipsis
+        keep = int(np.searchsorted(cumulative[start:start + len(text[row]) + 1],
+                                   cumulative[start] + room - ellipsis_width, side="right")) - 1
+        text[row] = text[row][:max(keep, 0)] + ELLIPSIS
+        widths[row] = cumulative[start + max(keep, 0)] - cumulative[start] + ellipsis_width
+
+
+def fit_text(pdf, text, room):
+    """
+    Cuts the strings wider than `room` in the current font, ending them with
+    an ellipsis.
+
+    Args:
+        pdf: an FPDF with the font already set.
+        text: strings, e.g. from format_column.
+        room (float): width available, in page units.
+
+    Returns:
+        (text, widths): the cut strings and their widths.
+    """
+    measure = _Widths(pdf)
+    widths, cumulative, starts = measure.of(text)
+    text = list(text)
+    _fit(text, widths, cumulative, starts, room, measure.of([ELLIPSIS])[0][0])
+    return text, widths
+
+
+def _column_widths(natural, available):
+    """
+    Splits the page width between columns.
+
+    Columns get their natural width and the space left over is shared
+    evenly. If the table is too wide, the columns wider than an even share are
+    narrowed until it fits.
+    """
+    natural = np.asarray(natural, dtype=np.float64)
+    if natural.sum() <= available:
+        return natural + (available - natural.sum()) / len(natural)
+
+    # Find the cap that makes the capped widths add up to the page width
+    widths = np.sort(natural)
+    for i in range(len(widths)):
+        cap = (available - widths[:i].sum()) / (len(widths) - i)
+        if cap <= widths[i]:
+            break
+    return np.minimum(natural, cap)
+
+
+def table_pdf(filename, title, columns):
+    """
+    Writes a table report in one pass.
+
+    Columns are formatted and measured up front, then rows are laid out over
+    as many pages as needed with the header row repeated on each page. Cell
+    text is written directly and the grid is drawn once per page, which is far
+    cheaper than a pdf.cell per value.
+
+    Args:
+        filename (str): The filename for the saved PDF.
+        title (str): shown above the table on the first page.
+        columns: (header, values) per column; values is a Series (all the same
+            length) or None for a blank column.
+    """
+    rows = next((len(values) for _, values in columns if values is not None), 0)
+    headers = [header for header, _ in columns]
+    text = [format_column(values, rows) for _, values in columns]
+
+    # fpdf is only needed once a report is rendered; keep it off the startup path
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.set_auto_page_break(False)
+    row_height = FONT_SIZE / pdf.k * 1.5
+
+    # --- Measure: header in bold, values in regular ---
+    pdf.set_font(FONT, "B", FONT_SIZE)
+    header_widths, _, _ = _Widths(pdf).of(headers)
+    pdf.set_font(FONT, size=FONT_SIZE)
+    measure = _Widths(pdf)
+    measured = [measure.of(column) for column in text]
+    natural = [
+        max(header_width, widths.max(initial=0)) + 2 * CELL_PADDING
+        for header_width, (widths, _, _) in zip(header_widths.tolist(), measured)
+    ]
+    col_widths = _column_widths(natural, pdf.epw)
+    col_x = pdf.l_margin + np.concatenate(([0.0], np.cumsum(col_widths)))
+
+    # --- Place: cut what does not fit, center the rest ---
+    ellipsis_width = measure.of([ELLIPSIS])[0][0]
+    x = []
+    for column, (widths, cumulative, starts), left, width in zip(text, measured, col_x.tolist(), col_widths.tolist()):
+        _fit(column, widths, cumulative, starts, width - 2 * CELL_PADDING, ellipsis_width)
+        x.append((left + (width - widths) / 2).tolist())
+    header_x = (col_x[:-1] + (col_widths - header_widths) / 2).tolist()
+    # Same baseline as pdf.cell
+    baseline = row_height / 2 + 0.3 * pdf.font_size
+    bottom = pdf.h - pdf.b_margin
+
+    # --- Write ---
+    row = 0
+    first = True
+    while first or row < rows:
+        pdf.add_page()
+        if first:
+            pdf.set_font(FONT, "B", TITLE_SIZE)
+            pdf.cell(0, 10, text=title, new_x="LMARGIN", new_y="NEXT", align="C")
+            pdf.ln(10)
+            first = False
+        top = pdf.get_y()
+        page_rows = max(1, int((bottom - top) // row_height) - 1)
+        end = min(row + page_rows, rows)
+
+        pdf.set_font(FONT, "B", FONT_SIZE)
+        for label, left in zip(headers, header_x):
+            pdf.text(left, top + baseline, label)
+
+        pdf.set_font(FONT, size=FONT_SIZE)
+        y = top + row_height
+        for i in range(row, end):
+            for column, column_x in zip(text, x):
+                if column[i]:
+                    pdf.text(column_x[i], y + baseline, column[i])
+            y += row_height
+
+        # Grid: one line per row boundary and per column boundary
+        for line_y in np.arange(end - row + 2) * row_height + top:
+            pdf.line(col_x[0], line_y, col_x[-1], line_y)
+        for line_x in col_x.tolist():
+            pdf.line(line_x, top, line_x, y)
+        row = end
+
+    pdf.output(filename)
@@ -0,0 +1,258 @@
+import hashlib
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+
+from metrics import log
+from pdf_table import table_pdf
+
+# Enough workers for the three reports, more if the machine has the cores
+WORKERS = max(3, os.cpu_count() or 1)
+_pool = None
+
+
+# --- Rows each report shows ---
+def turkey_order_rows(orders):
+    # Filter out orders with target_weight == 0
+    return orders[orders["target_weight"] != 0].sort_values(by='name')
+
+
+def free_turkey_rows(turkeys):
+    return turkeys[turkeys["assigned"] == False].sort_values(by='weight')  # get unassigned turkeys
+
+
+def ham_order_rows(orders):
+    # Filter orders: ham is not 'None' and assigned_tid is NaN
+    return orders[
+        (orders["ham"] != "None") & (orders["assigned_tid"].isna())
+        ].sort_values(by="name")
+
+
+def turkey_orders_pdf(orders, filename="orders_turkey_report.pdf"):
+    """
+    Creates a PDF from the orders DataFrame and saves it, excluding orders with target_weight = 0.
+
+    Args:
+        orders: the orders table.
+        filename (str): The filename for the saved PDF.
+
+    Returns:
+        str: the filename, or None if there was nothing to export.
+    """
+    df = turkey_order_rows(orders)
+
+    if df.empty:
+        log.info("No orders with target weight > 0 to export.")
+        return None
+
+    table_pdf(filename, "Orders Report", [
+        ("Name", df["name"]),
+        ("Turkey #", df["assigned_tid"]),
+        ("Assigned lbs", df["assigned_weight"]),
+        ("Target lbs", df["target_weight"]),
+        ("Ham", df["ham"]),
+        ("Notes", df["notes"]),
+    ])
+    log.info("PDF saved as '%s'", filename)
+    return filename
+
+
+def free_turkeys_pdf(turkeys, filename="free_turkeys.pdf"):
+    """
+    Creates a PDF listing only unassigned turkeys.
+    Columns: Name, Turkey #, Assigned lbs, Target lbs, Ham, Notes
+    Only Turkey # and Assigned lbs are filled; others are blank.
+
+    Returns:
+        str: the filename.
+    """
+    df = free_turkey_rows(turkeys)
+
+    table_pdf(filename, "Free Turkeys Report", [
+        ("Name", None),
+        ("Turkey #", df.index.to_series()),
+        ("Assigned lbs", df["weight"]),
+        ("Target lbs", None),
+        ("Ham", None),
+        ("Notes", None),
+    ])
+    log.info("PDF saved as '%s'", filename)
+    return filename
+
+
+def ham_orders_pdf(orders, filename="ham_orders_report.pdf"):
+    """
+    Creates a PDF from orders that have ham and no assigned turkey.
+
+    Args:
+        orders: the orders table.
+        filename (str): The filename for the saved PDF.
+
+    Returns:
+        str: the filename, or None if there was nothing to export.
+    """
+    df = ham_order_rows(orders)
+
+    if df.empty:
+        log.info("No ham orders without assigned turkeys.")
+        return None
+
+    table_pdf(filename, "Ham Orders Without Assigned Turkeys", [
+        ("Name", df["name"]),
+        ("Ham", df["ham"]),
+        ("Notes", df["notes"]),
+    ])
+    log.info("PDF saved as '%s'", filename)
+    return filename
+
+
+# Report -> (table it reads, rows it shows, render function, default filename)
+REPORTS = {
+    "orders": ("orders", turkey_order_rows, turkey_orders_pdf, "orders_turkey_report.pdf"),
+    "ham_orders": ("orders", ham_order_rows, ham_orders_pdf, "ham_orders_report.pdf"),
+    "free_turkeys": ("turkeys", free_turkey_rows, free_turkeys_pdf, "free_turkeys.pdf"),
+}
+
+
+def fingerprint(rows):
+    """
+    A content hash of the rows a report shows, in the order it shows them.
+    """
+    digest = hashlib.sha1(repr((rows.index.name, list(rows.columns))).encode())
+    digest.update(pd.util.hash_pandas_object(rows, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class ReportCache:
+    """
+    Remembers what each report file was rendered from.
+
+    A report is up to date when the fingerprint of its rows is unchanged and
+    the file on disk is still the one that was written.
+    """
+
+    def __init__(self):
+        self._entries = {}  # filename -> (fingerprint, saved filename or None, file stat)
+
+    def lookup(self, filename, fingerprint):
+        """
+        Returns:
+            (hit, saved): whether the report is up to date, and what its render returned.
+        """
+        entry = self._entries.get(filename)
+        if entry is None or entry[0] != fingerprint or entry[2] != _stat(entry[1]):
+            return False, None
+        return True, entry[1]
+
+    def store(self, filename, fingerprint, saved):
+        self._entries[filename] = (fingerprint, saved, _stat(saved))
+
+
+def _stat(filename):
+    if filename is None:
+        return None
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return "missing"
+    return stat.st_mtime_ns, stat.st_size
+
+
+def export(name, table, filename, cache):
+    """
+    Renders one report unless its rows are unchanged since the last render.
+
+    Returns:
+        str: the filename, or None if there was nothing to export.
+    """
+    _, rows, render, _ = REPORTS[name]
+    key = fingerprint(rows(table))
+    hit, saved = cache.lookup(filename, key)
+    if hit:
+        log.info("'%s' is up to date", filename)
+        return saved
+    saved = render(table, filename)
+    cache.store(filename, key, saved)
+    return saved
+
+
+def report_jobs(orders, turkeys, cache):
+    """
+    Freezes the tables for a report run and leaves out the reports whose rows
+    have not changed.
+
+    The copies are what the workers render, so edits made while the reports
+    build never show up half-way through a PDF.
+
+    Returns:
+        (jobs, hits): (report, table copy, filename, fingerprint) per report to
+        render, and the names of the reports that are up to date.
+    """
+    tables = {"orders": orders.copy(), "turkeys": turkeys.copy()}
+    jobs = []
+    hits = []
+    for name, (source, rows, _, filename) in REPORTS.items():
+        key = fingerprint(rows(tables[source]))
+        if cache.lookup(filename, key)[0]:
+            hits.append(name)
+        else:
+            jobs.append((name, tables[source], filename, key))
+    return jobs, hits
+
+
+def render_reports(jobs, cache, on_progress=None):
+    """
+    Renders the reports concurrently in the worker pool. Blocks until all are done,
+    so call it off the UI thread.
+
+    Args:
+        jobs: from report_jobs.
+        cache: the ReportCache the jobs were checked against; updated as reports finish.
+        on_progress: (done, total, filename or None) -> None, called as each report finishes.
+
+    Returns:
+        list: the filenames that were saved.
+    """
+    futures = {
+        worker_pool().submit(REPORTS[name][2], table, filename): (name, table, filename, key)
+        for name, table, filename, key in jobs
+    }
+    saved = []
+    for done, future in enumerate(as_completed(futures), 1):
+        name, table, filename, key = futures[future]
+        try:
+            result = future.result()
+        except BrokenProcessPool:
+            use_threads()
+            result = REPORTS[name][2](table, filename)
+        cache.store(filename, key, result)
+        if result is not None:
+            saved.append(result)
+        if on_progress is not None:
+            on_progress(done, len(jobs), result)
+    return saved
+
+
+def worker_pool():
+    """
+    The pool shared by every report run; created on first use.
+    """
+    global _pool
+    if _pool is None:
+        try:
+            # fpdf is pure Python, so processes are what actually render in parallel.
+            # Spawned, not forked: forking the multi-threaded UI process can deadlock
+            _pool = ProcessPoolExecutor(max_workers=WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        except (ImportError, NotImplementedError, OSError):
+            # No working multiprocessing (e.g. mobile builds)
+            use_threads()
+    return _pool
+
+
+def use_threads():
+    # The platform cannot run worker processes after all; use threads from now on
+    global _pool
+    _pool = ThreadPoolExecutor(max_workers=WORKERS)
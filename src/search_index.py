@@ -0,0 +1,140 @@
+import bisect
+from collections import defaultdict
+
+
+# Shorter queries are answered from word prefixes, longer ones from trigrams
+GRAM = 3
+# Up to this many changed orders are bisected in and out of the sorted word
+# list; more are merged with one filtering pass and one sort
+BISECT_CHANGES = 64
+
+
+class SearchIndex:
+    """
+    Case-insensitive lookup of orders by oid, name and notes.
+
+    Every order's text is split into trigrams, each mapping to the orders that
+    contain it, so a substring query only intersects the posting sets of its
+    own trigrams and checks the few candidates left. Queries shorter than a
+    trigram match the start of any word (or the oid) through a sorted word list.
+    Like SortedView, it catches up with Backend.changes_since and only
+    re-indexes the orders that changed.
+    """
+
+    def __init__(self):
+        self.version = None
+        self._text = {}                 # oid -> lowercased "oid\nname\nnotes"
+        self._grams = defaultdict(set)  # trigram -> oids
+        self._words = []                # sorted (word, oid)
+
+    def update(self, orders, backend_version, changes):
+        """
+        Brings the index up to `backend_version`.
+
+        Args:
+            orders: the backend's orders table (Backend.table), read in full
+                only on a rebuild.
+            backend_version: Backend.version the table is at.
+            changes: oids changed since self.version, or None if unknown.
+        """
+        if self.version == backend_version:
+            return
+        if changes is None or len(changes) * 8 > max(len(self._text), 64):
+            self._rebuild(orders.frame)
+        else:
+            changes = set(changes)
+            rows = orders.rows([oid for oid in changes if oid in orders])
+            keep_sorted = len(changes) <= BISECT_CHANGES
+            dropped = set()
+            for oid in changes:
+                dropped.update(self._remove(oid, keep_sorted))
+            if dropped:
+                self._words = [entry for entry in self._words if entry not in dropped]
+            for oid, text in zip(rows.index.tolist(), _texts(rows)):
+                self._add(oid, text, keep_sorted)
+            if not keep_sorted:
+                self._words.sort()
+        self.version = backend_version
+
+    def search(self, query):
+        """
+        Returns:
+            set: oids matching every word of the query, or None for an empty query.
+        """
+        terms = query.lower().split()
+        if not terms:
+            return None
+        hits = None
+        # Longest terms first: they narrow the candidates the most
+        for term in sorted(terms, key=len, reverse=True):
+            found = self._substring(term) if len(term) >= GRAM else self._prefix(term)
+            hits = found if hits is None else hits & found
+            if not hits:
+                return set()
+        return hits
+
+    def _substring(self, term):
+        postings = []
+        for gram in {term[i:i + GRAM] for i in range(len(term) - GRAM + 1)}:
+            oids = self._grams.get(gram)
+            if not oids:
+                return set()
+            postings.append(oids)
+        postings.sort(key=len)
+        candidates = set.intersection(*postings)
+        if len(term) == GRAM:
+            return candidates
+        return {oid for oid in candidates if term in self._text[oid]}
+
+    def _prefix(self, term):
+        hits = set()
+        for word, oid in self._words[bisect.bisect_left(self._words, (term,)):]:
+            if not word.startswith(term):
+                break
+            hits.add(oid)
+        return hits
+
+    def _rebuild(self, orders):
+        self._text = {}
+        self._grams = defaultdict(set)
+        self._words = []
+        for oid, text in zip(orders.index.tolist(), _texts(orders)):
+            self._add(oid, text)
+        self._words.sort()
+
+    def _add(self, oid, text, keep_sorted=False):
+        # Without keep_sorted self._words is left unsorted, and the caller
+        # sorts once after a batch; a few edits insert in place instead
+        self._text[oid] = text
+        for i in range(len(text) - GRAM + 1):
+            self._grams[text[i:i + GRAM]].add(oid)
+        if keep_sorted:
+            for word in set(text.split()):
+                bisect.insort(self._words, (word, oid))
+        else:
+            self._words.extend((word, oid) for word in set(text.split()))
+
+    def _remove(self, oid, keep_sorted=True):
+        # Returns the words left for the caller to drop without keep_sorted
+        text = self._text.pop(oid, None)
+        if text is None:
+            return []
+        for i in range(len(text) - GRAM + 1):
+            gram = text[i:i + GRAM]
+            oids = self._grams[gram]
+            oids.discard(oid)
+            if not oids:
+                del self._grams[gram]
+        if not keep_sorted:
+            return [(word, oid) for word in set(text.split())]
+        for word in set(text.split()):
+            del self._words[bisect.bisect_left(self._words, (word, oid))]
+        return []
+
+
+def _texts(orders):
+    # One lowercased document per order; fields on separate lines so no
+    # match runs across two of them
+    names = orders["name"].fillna("").astype(str)
+    notes = orders["notes"].fillna("").astype(str)
+    return (orders.index.astype(str) + "\n" + names + "\n" + notes).str.lower().tolist()
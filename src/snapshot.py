@@ -0,0 +1,132 @@
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+# Loading a 100k-row season snapshot must stay under this many seconds
+LOAD_BUDGET_SECONDS = 0.5
+LOAD_BUDGET_ROWS = 100_000
+
+
+def save_tables(path, tables):
+    """
+    Writes DataFrames as a typed columnar snapshot directory.
+
+    Every column becomes one .npy file (string columns are a UTF-8 blob plus
+    character offsets), described by a schema.json per table. The directory is
+    written beside `path` and swapped in at the end, so a crash never leaves a
+    half-written snapshot behind.
+
+    Args:
+        path (str): the snapshot directory.
+        tables (dict): table name -> DataFrame.
+    """
+    tmp_path = path + ".tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    for name, df in tables.items():
+        _write_table(os.path.join(tmp_path, name), df)
+
+    old_path = path + ".old"
+    if os.path.exists(path):
+        shutil.rmtree(old_path, ignore_errors=True)
+        os.replace(path, old_path)
+    os.replace(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+
+
+def load_tables(path, names):
+    """
+    Reads tables written by save_tables; numeric columns are memory-mapped.
+
+    Args:
+        path (str): the snapshot directory.
+        names: the tables to read; those the snapshot lacks are left out.
+
+    Returns:
+        (tables, seconds): table name -> DataFrame, and the time it took.
+    """
+    start = time.perf_counter()
+    tables = {
+        name: _read_table(os.path.join(path, name))
+        for name in names if os.path.exists(os.path.join(path, name))
+    }
+    return tables, time.perf_counter() - start
+
+
+def load_budget(rows):
+    # The budget scales with size but never drops below a tenth of the 100k one
+    return LOAD_BUDGET_SECONDS * max(rows / LOAD_BUDGET_ROWS, 0.1)
+
+
+def _write_table(directory, df):
+    os.makedirs(directory)
+    columns = [_write_column(directory, f"c{i}", df[column]) for i, column in enumerate(df.columns)]
+    for spec, column in zip(columns, df.columns):
+        spec["name"] = column
+    index = _write_column(directory, "index", df.index.to_series())
+    index["name"] = df.index.name
+    with open(os.path.join(directory, "schema.json"), "w") as f:
+        json.dump({"rows": len(df), "index": index, "columns": columns}, f)
+
+
+def _read_table(directory):
+    with open(os.path.join(directory, "schema.json")) as f:
+        schema = json.load(f)
+    data = {spec["name"]: _read_column(directory, spec) for spec in schema["columns"]}
+    index = pd.Index(_read_column(directory, schema["index"]), name=schema["index"]["name"])
+    # Without copy=False pandas copies the mapped arrays into its own blocks
+    return pd.DataFrame(data, index=index, columns=[spec["name"] for spec in schema["columns"]], copy=False)
+
+
+def _write_column(directory, key, series):
+    values = series.to_numpy()
+    if values.dtype != object:
+        np.save(os.path.join(directory, f"{key}.npy"), values)
+        return {"file": key, "encoding": "plain"}
+
+    missing = series.isna().to_numpy()
+    present = values[~missing]
+    # 0 present, 1 NA (or None), 2 NaN: pandas tells the two apart, e.g. an
+    # order never matched reads NaN and one unmatched reads NA
+    nan = np.array([isinstance(value, float) for value in values], dtype=bool) & missing
+    np.save(os.path.join(directory, f"{key}.missing.npy"), missing.astype(np.uint8) + nan)
+    if all(isinstance(value, str) for value in present):
+        # Strings: one blob plus offsets into the decoded text
+        text = "".join(present)
+        offsets = np.zeros(len(present) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in present], out=offsets[1:])
+        np.save(os.path.join(directory, f"{key}.offsets.npy"), offsets)
+        with open(os.path.join(directory, f"{key}.utf8"), "wb") as f:
+            f.write(text.encode("utf-8", "surrogatepass"))
+        return {"file": key, "encoding": "string"}
+
+    # Numbers with gaps (e.g. assigned_tid): keep ints as ints
+    dtype = np.int64 if all(isinstance(value, (int, np.integer)) for value in present) else np.float64
+    np.save(os.path.join(directory, f"{key}.npy"), present.astype(dtype))
+    return {"file": key, "encoding": "nullable"}
+
+
+def _read_column(directory, spec):
+    key = spec["file"]
+    if spec["encoding"] == "plain":
+        # A plain ndarray view of the mapping, so readers never see a memmap
+        return np.load(os.path.join(directory, f"{key}.npy"), mmap_mode="c").view(np.ndarray)
+
+    kinds = np.load(os.path.join(directory, f"{key}.missing.npy"))
+    missing = kinds != 0
+    column = np.empty(len(kinds), dtype=object)
+    column[kinds == 1] = pd.NA
+    column[kinds == 2] = np.nan
+    if spec["encoding"] == "string":
+        offsets = np.load(os.path.join(directory, f"{key}.offsets.npy")).tolist()
+        with open(os.path.join(directory, f"{key}.utf8"), "rb") as f:
+            text = f.read().decode("utf-8", "surrogatepass")
+        column[~missing] = [text[start:end] for start, end in zip(offsets, offsets[1:])]
+    else:
+        values = np.load(os.path.join(directory, f"{key}.npy"), mmap_mode="c")
+        # As the backend stores them: tids as ints, weights as read from the turkeys table
+        column[~missing] = values.tolist() if values.dtype == np.int64 else list(values)
+    return column
@@ -0,0 +1,67 @@
+import bisect
+
+
+class SortedView:
+    """
+    A cached sort order of one backend table, kept up to date incrementally.
+
+    Holds (sort value, id) pairs for the rows that pass `keep`. When the backend
+    version moves on, only the rows reported by Backend.changes_since are
+    re-placed with bisect; a full re-sort happens only when the change log no
+    longer reaches back far enough or most of the table changed.
+    """
+
+    def __init__(self, column, keep=None):
+        self.column = column    # a column, or the index name (tid/oid)
+        self.keep = keep        # table -> boolean mask, or None for every row
+        self.version = None
+        self._entries = []      # sorted (value, id)
+        self._ids = []          # the ids of _entries, same order
+        self._value_of = {}     # id -> value currently in _entries
+
+    def ids(self, table, backend_version, changes, ascending=True):
+        """
+        Returns the row ids in sort order.
+
+        Args:
+            table: the backend table (Backend.table), read in full only on a re-sort.
+            backend_version: Backend.version the table is at.
+            changes: ids changed since self.version, or None if unknown.
+            ascending (bool): sort direction.
+        """
+        if self.version != backend_version:
+            by_index = self.column == table.index_name
+            if changes is None or len(changes) * 8 > max(len(self._entries), 64):
+                self._rebuild(table.frame, by_index)
+            else:
+                self._apply(table, changes, by_index)
+            self.version = backend_version
+        # Plain list copies: no per-row Python work on an unchanged view
+        return self._ids[:] if ascending else self._ids[::-1]
+
+    def _values(self, table, by_index):
+        return table.index.to_series() if by_index else table[self.column]
+
+    def _rebuild(self, table, by_index):
+        if self.keep is not None:
+            table = table[self.keep(table)]
+        values = self._values(table, by_index)
+        self._value_of = dict(zip(table.index.tolist(), values.tolist()))
+        self._entries = sorted((value, key) for key, value in self._value_of.items())
+        self._ids = [key for _, key in self._entries]
+
+    def _apply(self, table, changes, by_index):
+        for key in set(changes):
+            if key in self._value_of:
+                pos = bisect.bisect_left(self._entries, (self._value_of.pop(key), key))
+                del self._entries[pos]
+                del self._ids[pos]
+
+        rows = table.rows([key for key in set(changes) if key in table])
+        if self.keep is not None:
+            rows = rows[self.keep(rows)]
+        for key, value in zip(rows.index.tolist(), self._values(rows, by_index).tolist()):
+            self._value_of[key] = value
+            pos = bisect.bisect_left(self._entries, (value, key))
+            self._entries.insert(pos, (value, key))
+            self._ids.insert(pos, key)
@@ -0,0 +1,114 @@
+import pandas as pd
+
+
+class BufferedTable:
+    """
+    A table whose new and deleted rows wait in buffers until the whole table is read.
+
+    Appending is an O(1) dict insert and deleting an O(1) set insert (the row
+    stays in the frame as a tombstone). Single rows are read and written in
+    place, wherever they live, and rows(keys) builds a frame of just the rows
+    asked for, so the UI and single-row edits never pay for the table size.
+    Only `frame`, the whole table, drops the deleted rows and concatenates the
+    pending ones, once for all the changes since the last full read.
+    """
+
+    def __init__(self, frame):
+        self.index_name = frame.index.name
+        self.columns = list(frame.columns)
+        # New rows take these dtypes, so reads look the same wherever a row was stored
+        self.dtypes = frame.dtypes.to_dict()
+        self._frame = frame
+        self._pending = {}  # key -> {column: value}, in insertion order
+        self._deleted = set()  # keys still in _frame but deleted
+
+    def __len__(self):
+        return len(self._frame) - len(self._deleted) + len(self._pending)
+
+    def __contains__(self, key):
+        return key in self._pending or (key in self._frame.index and key not in self._deleted)
+
+    @property
+    def frame(self):
+        """
+        The whole table as a DataFrame, with the pending rows appended.
+        """
+        if self._deleted:
+            self._frame = self._frame[~self._frame.index.isin(list(self._deleted))]
+            self._deleted = set()
+        if self._pending:
+            new_rows = self._pending_rows(list(self._pending))
+            self._pending = {}
+            self._frame = new_rows if self._frame.empty else pd.concat([self._frame, new_rows])
+        return self._frame
+
+    def append(self, key, row):
+        self._pending[key] = {column: row[column] for column in self.columns}
+
+    def delete(self, key):
+        # A deleted key can come back (undo), as a pending row
+        if self._pending.pop(key, None) is None:
+            self._deleted.add(key)
+
+    def get(self, key, column):
+        row = self._pending.get(key)
+        if row is None:
+            return self._frame.at[key, column]
+        # Typed as the stored column would give it back (np.float64, np.bool_)
+        dtype = self.dtypes[column]
+        return row[column] if dtype == object else dtype.type(row[column])
+
+    def set(self, key, column, value):
+        row = self._pending.get(key)
+        if row is None:
+            self._frame.at[key, column] = value
+        else:
+            row[column] = value
+
+    def set_many(self, keys, column, values):
+        """
+        Sets `column` for many rows; `values` is one value for all, or a list
+        parallel to `keys`.
+        """
+        one_value = not isinstance(values, list)
+        stored = []
+        for key, value in zip(keys, [values] * len(keys) if one_value else values):
+            row = self._pending.get(key)
+            if row is None:
+                stored.append((key, value))
+            else:
+                row[column] = value
+        if stored:
+            # A single value is set as a scalar, which pandas casts (e.g. NA to NaN)
+            self._frame.loc[[key for key, _ in stored], column] = values if one_value else [value for _, value in stored]
+
+    def row(self, key):
+        """
+        Returns:
+            dict: column -> value for one row.
+        """
+        row = self._pending.get(key)
+        return dict(row) if row is not None else dict(zip(self.columns, self._frame.loc[key].tolist()))
+
+    def rows(self, keys):
+        """
+        Returns:
+            DataFrame: the rows for `keys`, in that order.
+        """
+        keys = list(keys)
+        if not any(key in self._pending for key in keys):
+            return self._frame.loc[keys]
+        new_rows = self._pending_rows([key for key in keys if key in self._pending])
+        stored = [key for key in keys if key not in self._pending]
+        if not stored:
+            return new_rows.loc[keys]
+        return pd.concat([self._frame.loc[stored], new_rows]).loc[keys]
+
+    def _pending_rows(self, keys):
+        # Column by column: much cheaper than a frame built row by row. Object
+        # columns stay object, so a tid stays an int and a missing one stays NA.
+        index = pd.Index(keys, name=self.index_name)
+        return pd.DataFrame({
+            column: pd.Series([self._pending[key][column] for key in keys], index=index, dtype=self.dtypes[column])
+            for column in self.columns
+        })
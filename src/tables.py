@@ -0,0 +1,201 @@
+import flet as ft
+import pandas as pd
+
+# Rows materialized per table page
+ROWS_PER_PAGE = 50
+
+
+# --- Cell contents: (text, color) per column ---
+def turkey_cells(tid, t):
+    return [
+        (str(tid), None),
+        (str(t["weight"]), None),
+        ("Yes", ft.Colors.GREEN) if t["assigned"] else ("No", ft.Colors.RED),
+    ]
+
+
+def order_cells(oid, o, constraints=(None, None, None)):
+    matched = pd.notna(o["assigned_tid"])
+    return [
+        (str(oid), None),
+        (o["name"], None),
+        (str(o["target_weight"]), None),
+        (o["ham"], None),
+        (str(o["assigned_tid"]), ft.Colors.GREEN) if matched else ("No", ft.Colors.RED),
+        (str(o["assigned_weight"]), ft.Colors.GREEN) if pd.notna(o["assigned_weight"]) else ("No", ft.Colors.RED),
+        (o["notes"], None),
+        (order_range(*constraints), None),
+    ]
+
+
+def order_range(low, high, priority):
+    # e.g. "12-16 lbs P1", showing only what was set on the order (see Backend.constraints)
+    text = ""
+    if low is not None and high is not None:
+        text = f"{low:g}-{high:g} lbs"
+    elif low is not None:
+        text = f"≥{low:g} lbs"
+    elif high is not None:
+        text = f"≤{high:g} lbs"
+    if priority is not None:
+        text = f"{text} P{priority}".strip()
+    return text
+
+
+def build_row(key, cells, selected, on_select):
+    return ft.DataRow(
+        cells=[ft.DataCell(ft.Text(text, color=color)) for text, color in cells],
+        selected=selected,
+        on_select_changed=lambda e, key=key: on_select(key),
+    )
+
+
+class TableView:
+    """
+    Keeps an ft.DataTable in step with a sorted table by patching rows in place.
+
+    Rows are kept in a map keyed by tid/oid. A refresh only creates rows for new
+    keys, rewrites the cells whose text or color changed, drops rows that went
+    away and reorders the row list if the order changed, so Flet only sends
+    the controls that actually differ.
+
+    With a page_size only one page of the sorted table is materialized; the
+    `pager` row moves between pages, so render cost does not grow with the
+    number of rows.
+    """
+
+    def __init__(self, table: ft.DataTable, cells, on_select, page_size=None, on_page=None):
+        self.table = table
+        self.cells = cells          # (key, record) -> [(text, color), ...]
+        self.on_select = on_select  # key -> None
+        self.on_page = on_page      # () -> None, redraws after a page turn
+        self.rows = {}              # key -> ft.DataRow
+        self.values = {}            # key -> cells last shown
+        self.keys = []              # keys in display order
+        self.header_state = None
+
+        # --- Paging ---
+        self.page_size = page_size
+        self.page = 0
+        self.total = 0
+        self.page_text = ft.Text("")
+        self.prev_btn = ft.IconButton(ft.Icons.CHEVRON_LEFT, on_click=lambda e: self.turn_page(-1))
+        self.next_btn = ft.IconButton(ft.Icons.CHEVRON_RIGHT, on_click=lambda e: self.turn_page(1))
+        self.pager = ft.Row(
+            [self.prev_btn, self.page_text, self.next_btn],
+            alignment=ft.MainAxisAlignment.CENTER,
+            visible=page_size is not None,
+        )
+
+    def turn_page(self, step):
+        self.page += step
+        if self.on_page is not None:
+            self.on_page()
+
+    def _page_window(self, keys):
+        pages = max(1, -(-len(keys) // self.page_size))
+        self.page = min(max(self.page, 0), pages - 1)
+        start = self.page * self.page_size
+        return keys[start:start + self.page_size]
+
+    def prepare(self, table, keys, changed=None):
+        """
+        Reads the rows the next show() needs. Call it under the backend lock;
+        it touches no control, so the lock can be released before show()
+        sends anything to the client.
+
+        Args:
+            table: the backend table (Backend.table); only the rows shown are read.
+            keys: ids in display order.
+            changed: set of ids changed since the last show, or None if
+                unknown. If the page still shows the same ids in the same
+                order, only these rows are read.
+
+        Returns:
+            tuple: (keys on the page, keys to patch, key -> record).
+        """
+        self.total = len(keys)
+        if self.page_size is not None:
+            keys = self._page_window(keys)
+        patch = keys
+        if changed is not None and keys == self.keys:
+            patch = [key for key in keys if key in changed]
+        return keys, patch, table.rows(patch).to_dict("index")
+
+    def show(self, prepared, selected):
+        """
+        Shows the rows read by prepare(), in order, patching only what changed.
+
+        Args:
+            prepared: the result of prepare().
+            selected: the selected id, or None.
+        """
+        keys, patch, records = prepared
+        for key in patch:
+            values = self.cells(key, records[key])
+            row = self.rows.get(key)
+            if row is None:
+                self.rows[key] = build_row(key, values, key == selected, self.on_select)
+            else:
+                if values != self.values[key]:
+                    for cell, old, (text, color) in zip(row.cells, self.values[key], values):
+                        if old != (text, color):
+                            cell.content.value = text
+                            cell.content.color = color
+                if row.selected != (key == selected):
+                    row.selected = key == selected
+            self.values[key] = values
+
+        if len(self.rows) != len(keys):
+            shown = set(keys)
+            for key in [key for key in self.rows if key not in shown]:
+                del self.rows[key]
+                del self.values[key]
+
+        if keys != self.keys:
+            self.table.rows = [self.rows[key] for key in keys]
+            self.keys = keys
+        if self.page_size is not None:
+            self._show_pager()
+        self.table.update()
+
+    def _show_pager(self):
+        pages = max(1, -(-self.total // self.page_size))
+        start = self.page * self.page_size
+        end = min(start + self.page_size, self.total)
+        self.page_text.value = f"{start + 1 if self.total else 0}–{end} of {self.total}"
+        self.prev_btn.disabled = self.page == 0
+        self.next_btn.disabled = self.page == pages - 1
+        if self.pager.page is not None:
+            self.pager.update()
+
+    def select(self, old, new):
+        """
+        Moves the selection highlight without touching any other row.
+
+        Args:
+            old: the previously selected id, or None.
+            new: the newly selected id, or None.
+        """
+        for key, selected in ((old, False), (new, True)):
+            row = self.rows.get(key)
+            if row is not None and row.selected != selected:
+                row.selected = selected
+                row.update()
+
+    def set_headers(self, labels, sort_col, sort_asc):
+        """
+        Rewrites the sort arrows in the column headers, only when the sort changed.
+
+        Args:
+            labels: (column key or None, label) per DataColumn.
+        """
+        if self.header_state == (sort_col, sort_asc):
+            return
+        self.header_state = (sort_col, sort_asc)
+        for column, (key, label) in zip(self.table.columns, labels):
+            if key == sort_col:
+                label = f"{label} {'↑' if sort_asc else '↓'}"
+            elif key is not None:
+                label = f"{label} "
+            column.label.value = label
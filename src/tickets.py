@@ -0,0 +1,152 @@
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import reports
+from metrics import log
+from pdf_table import FONT, fit_text, format_column
+
+# Ticket grid on an A4 page, cut along the dashed lines
+TICKET_COLUMNS = 2
+TICKET_ROWS = 4
+TICKETS_PER_PAGE = TICKET_COLUMNS * TICKET_ROWS
+MARGIN = 10
+PADDING = 5
+
+# Orders per worker chunk: whole pages, so merged chunks leave no gaps
+CHUNK_SIZE = 250 * TICKETS_PER_PAGE
+ORDERINGS = ("oid", "name")
+CORES = os.cpu_count() or 1
+
+# (font style, size, baseline below the ticket top) per ticket line
+LINES = [
+    ("B", 18, 13),  # name
+    ("", 12, 23),   # order number
+    ("B", 16, 37),  # turkey and weight
+    ("", 12, 47),   # ham
+    ("I", 11, 58),  # notes
+]
+
+
+def ticket_lines(orders, order_by="oid"):
+    """
+    Formats the text of every ticket up front, in print order.
+
+    Returns:
+        list: one tuple of LINES strings per order.
+    """
+    if order_by == "oid":
+        orders = orders.sort_index()
+    else:
+        orders = orders.sort_index().sort_values(by="name", kind="stable")
+
+    rows = len(orders)
+    tids = format_column(orders["assigned_tid"], rows)
+    weights = format_column(orders["assigned_weight"], rows)
+    return list(zip(
+        format_column(orders["name"], rows),
+        [f"Order #{oid}" for oid in format_column(orders.index.to_series(), rows)],
+        [f"Turkey #{tid} - {weight} lbs" if tid else "No turkey assigned" for tid, weight in zip(tids, weights)],
+        [f"Ham: {ham}" if ham != "None" else "" for ham in format_column(orders["ham"], rows)],
+        format_column(orders["notes"], rows),
+    ))
+
+
+def pickup_tickets_pdf(orders, filename="pickup_tickets.pdf", order_by="oid", chunk_size=CHUNK_SIZE):
+    """
+    Creates a PDF with one pickup ticket per order.
+
+    Large runs are split into chunks that render in the worker pool and are
+    merged back in order.
+
+    Args:
+        orders: the orders table.
+        filename (str): The filename for the saved PDF.
+        order_by (str): "oid" or "name".
+        chunk_size (int): orders per chunk, rounded up to whole pages.
+
+    Returns:
+        str: the filename, or None if there was nothing to export.
+    """
+    if order_by not in ORDERINGS:
+        raise ValueError(f"Unknown ticket order '{order_by}', expected one of {ORDERINGS}!")
+    if orders.empty:
+        log.info("No orders to print pickup tickets for.")
+        return None
+
+    tickets = ticket_lines(orders, order_by)
+    chunk_size = -(-chunk_size // TICKETS_PER_PAGE) * TICKETS_PER_PAGE
+    chunks = [tickets[start:start + chunk_size] for start in range(0, len(tickets), chunk_size)]
+
+    # Chunks only pay for the merge when they really render side by side
+    pool = reports.worker_pool()
+    parallel = len(chunks) > 1 and isinstance(pool, ProcessPoolExecutor) and CORES > 1
+    writer_class = _pdf_writer() if parallel else None
+    if parallel and writer_class is None:
+        log.warning("pypdf is not installed: rendering %d pickup tickets in one process (pip install pypdf).", len(tickets))
+    if writer_class is not None:
+        try:
+            _render_chunks(pool, chunks, filename, writer_class)
+        except BrokenProcessPool:
+            reports.use_threads()
+            _render(tickets, filename)
+    else:
+        _render(tickets, filename)
+
+    log.info("PDF saved as '%s'", filename)
+    return filename
+
+
+def _pdf_writer():
+    # Merging chunk files needs pypdf; without it tickets render in one process.
+    # Imported on first use so startup does not pay for it
+    try:
+        from pypdf import PdfWriter
+    except ImportError:
+        return None
+    return PdfWriter
+
+
+def _render_chunks(pool, chunks, filename, writer_class):
+    directory = tempfile.mkdtemp(prefix="tickets-")
+    try:
+        parts = [os.path.join(directory, f"{i:05d}.pdf") for i in range(len(chunks))]
+        # map yields in submission order, so the merge keeps the sort order
+        list(pool.map(_render, chunks, parts))
+        writer = writer_class()
+        for part in parts:
+            writer.append(part)
+        writer.write(filename)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def _render(tickets, filename):
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.set_auto_page_break(False)
+    width = (pdf.w - 2 * MARGIN) / TICKET_COLUMNS
+    height = (pdf.h - 2 * MARGIN) / TICKET_ROWS
+
+    # Cut every line to the ticket width in its own font, a column at a time
+    lines = []
+    for (style, size, _), column in zip(LINES, zip(*tickets)):
+        pdf.set_font(FONT, style, size)
+        lines.append(fit_text(pdf, column, width - 2 * PADDING)[0])
+
+    for i, ticket in enumerate(zip(*lines)):
+        slot = i % TICKETS_PER_PAGE
+        if slot == 0:
+            pdf.add_page()
+            pdf.set_dash_pattern(dash=2, gap=1.5)
+        x = MARGIN + (slot % TICKET_COLUMNS) * width
+        y = MARGIN + (slot // TICKET_COLUMNS) * height
+        pdf.rect(x, y, width, height)
+        for (style, size, baseline), text in zip(LINES, ticket):
+            if text:
+                pdf.set_font(FONT, style, size)
+                pdf.text(x + PADDING, y + baseline, text)
+    pdf.output(filename)
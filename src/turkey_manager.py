@@ -1,13 +1,75 @@
-from readline import backend
+import os
+import threading
 
 import flet as ft
 import pandas as pd
 from backend import Backend  # your backend logic
+from matching import DEFAULT_TOLERANCE, STRATEGIES
+from metrics import log, metrics
+from sorted_view import SortedView
+
+# Sort mode -> (column, ascending, only unassigned rows)
+TURKEY_SORTS = {
+    "tid_asc": ("tid", True, False),
+    "tid_desc": ("tid", False, False),
+    "weight_asc": ("weight", True, False),
+    "weight_desc": ("weight", False, False),
+    "unassigned_weight_asc": ("weight", True, True),
+    "unassigned_weight_desc": ("weight", False, True),
+}
+ORDER_SORTS = {
+    "oid_asc": ("oid", True, False),
+    "oid_desc": ("oid", False, False),
+    "target_weight_asc": ("target_weight", True, False),
+    "target_weight_desc": ("target_weight", False, False),
+    "unassigned_weight_asc": ("target_weight", True, True),
+    "unassigned_weight_desc": ("target_weight", False, True),
+}
+
+
+# Seconds of typing pause before the order search runs
+SEARCH_DELAY = 0.15
+
+
+# Width in characters of the longest histogram bar
+DASHBOARD_BAR = 16
+
+
+def dashboard_lines(stats, bin_width):
+    # Totals, then free turkeys next to waiting orders per weight bin
+    lines = [
+        f"Orders {stats['orders']}: {stats['matched']} matched, {stats['unmatched']} unmatched",
+        f"Turkeys {stats['turkeys']}: {stats['free_turkeys_total']} free",
+        "Ham: " + (", ".join(f"{ham} {n}" for ham, n in sorted(stats["ham"].items())) or "-"),
+    ]
+    free, waiting = stats["free_turkeys"], stats["waiting_orders"]
+    bins = sorted(set(free) | set(waiting))
+    if not bins:
+        return "\n".join(lines)
+    peak = max(max(free.values(), default=0), max(waiting.values(), default=0))
+    lines.append(f"{'lbs':<11} {'free turkeys':<{DASHBOARD_BAR + 6}} waiting orders")
+    for start in bins:
+        turkeys, orders = free.get(start, 0), waiting.get(start, 0)
+        turkey_bar = "█" * round(turkeys / peak * DASHBOARD_BAR)
+        order_bar = "█" * round(orders / peak * DASHBOARD_BAR)
+        lines.append(f"{f'{start:g}-{start + bin_width:g}':<11} {turkey_bar:<{DASHBOARD_BAR}} {turkeys:>5} {order_bar:<{DASHBOARD_BAR}} {orders:>5}")
+    return "\n".join(lines)
+
+
+def unassigned_turkeys(df):
+    return ~df["assigned"]
+
+
+def unassigned_orders(df):
+    return df["assigned_tid"].isna()
+
 
 class TurkeyManager:
-    def __init__(self, backend: Backend, refresh_cb):
+    def __init__(self, backend: Backend, refresh_cb, select_cb=None):
         self.backend = backend
         self.refresh = refresh_cb
+        # (table, old id, new id) -> None; moves the highlight without a refresh
+        self.select_cb = select_cb
 
         # Selected items
         self.selected_turkey = None
@@ -24,6 +86,8 @@ class TurkeyManager:
         ]
         self.turkey_sort_index = 0
         self.order_sort_index = 0
+        # (table, column, filter) -> SortedView, kept across refreshes
+        self._sorted_views = {}
 
         # --- Create input fields ---
         self.tid_input = ft.TextField(label="Turkey ID", width=100)
@@ -43,6 +107,32 @@ class TurkeyManager:
             ]),
             value="None"
         )
+        # Customer lookup at the pickup counter; filters the order table
+        self.search_input = ft.TextField(
+            label="Search orders (name, notes, #)",
+            width=300,
+            on_change=lambda e: self.search_changed(),
+            on_focus=lambda e: self.warm_search(),
+        )
+        self._search_timer = None
+        # Constrained matching: range and priority tier of the selected order
+        self.min_weight_input = ft.TextField(label="Min lbs", width=90)
+        self.max_weight_input = ft.TextField(label="Max lbs", width=90)
+        self.priority_input = ft.TextField(label="Priority", width=90)
+        self.tolerance_input = ft.TextField(label="Tolerance (lbs)", width=200, value=str(DEFAULT_TOLERANCE))
+
+        # Live weigh-in: each added turkey is matched on the spot
+        self.live_checkbox = ft.Checkbox(
+            label="Live weigh-in",
+            value=backend.live_match,
+            on_change=lambda e: self.set_live_mode()
+        )
+        self.swaps_checkbox = ft.Checkbox(
+            label="Allow swaps",
+            value=backend.live_swaps,
+            on_change=lambda e: self.set_live_mode()
+        )
+        self.live_status = ft.Text("")
 
         # --- Create buttons ---
         self.add_turkey_btn = ft.ElevatedButton(
@@ -57,6 +147,14 @@ class TurkeyManager:
             "Auto Match",
             on_click=lambda e: self.auto_match()
         )
+        self.match_strategy_dropdown = ft.Dropdown(
+            label="Match Strategy",
+            width=200,
+            options=[ft.dropdown.Option(strategy) for strategy in STRATEGIES],
+            value="greedy",
+        )
+        # Quality of the last auto match run, and why orders were left unmatched
+        self.match_status = ft.Text("", size=12)
 
         self.add_order_btn = ft.ElevatedButton(
             "Add Order",
@@ -78,11 +176,70 @@ class TurkeyManager:
             "Unmatch Selected Order",
             on_click=lambda e: self.unmatch_selected_order()
         )
+        self.constrain_order_btn = ft.ElevatedButton(
+            "Set Range",
+            on_click=lambda e: self.constrain_selected_order()
+        )
         # Button to generate all PDFs
         self.make_pdfs_btn = ft.ElevatedButton(
             text="Generate PDFs",
             on_click=lambda e: self.make_pdf()
         )
+        # One pickup ticket per order, in name order for the pickup line
+        self.tickets_btn = ft.ElevatedButton(
+            text="Pickup Tickets",
+            on_click=lambda e: self.make_tickets()
+        )
+        # Undo / redo the last command; the labels say what they would apply
+        self.undo_btn = ft.ElevatedButton(
+            "Undo",
+            disabled=True,
+            on_click=lambda e: self.undo()
+        )
+        self.redo_btn = ft.ElevatedButton(
+            "Redo",
+            disabled=True,
+            on_click=lambda e: self.redo()
+        )
+        # CSV import (scale readings or order sheets)
+        self.import_picker = ft.FilePicker(on_result=lambda e: self.import_file_picked(e))
+        self.import_btn = ft.ElevatedButton(
+            "Import…",
+            on_click=lambda e: self.import_picker.pick_files(
+                dialog_title="Import turkeys or orders CSV",
+                allowed_extensions=["csv"],
+            )
+        )
+        self.import_status = ft.Text("")
+
+        # Closest free turkeys for the selected order
+        self.suggestions_row = ft.Row(wrap=True, spacing=5)
+
+        # Supply / demand: weight histograms and totals from the backend's running counts
+        self.bin_width_input = ft.TextField(
+            label="Bin (lbs)",
+            width=90,
+            value="1",
+            on_submit=lambda e: self.update_dashboard()
+        )
+        self.dashboard_text = ft.Text("", size=11, font_family="monospace")
+        self.dashboard_panel = ft.ExpansionTile(
+            title=ft.Text("Supply / demand"),
+            controls=[self.bin_width_input, self.dashboard_text],
+        )
+
+        # Operation timings and counters, shown when TURKEYS_STATS is set
+        self.stats_text = ft.Text("", size=11, font_family="monospace", color=ft.Colors.WHITE)
+        self.stats_overlay = ft.Container(
+            content=self.stats_text,
+            right=10,
+            bottom=10,
+            padding=8,
+            border_radius=6,
+            bgcolor=ft.Colors.with_opacity(0.8, ft.Colors.BLACK),
+            visible=bool(os.getenv("TURKEYS_STATS")),
+        )
+
         # Turkey inputs: Enter moves focus from TID -> Weight, then adds turkey
         self.tid_input.on_submit = lambda e: self.weight_input.focus()
         self.weight_input.on_submit = lambda e: self.add_turkey_from_inputs()
@@ -95,21 +252,131 @@ class TurkeyManager:
 
     # --- Logic functions ---
     def select_turkey(self, tid):
-        self.selected_turkey = tid
-        self.refresh()
+        old, self.selected_turkey = self.selected_turkey, tid
+        if self.select_cb is None:
+            self.refresh()
+        else:
+            self.select_cb("turkeys", old, tid)
 
     def select_order(self, oid):
-        self.selected_order = oid
+        old, self.selected_order = self.selected_order, oid
+        if self.select_cb is None:
+            self.refresh()
+        else:
+            self.select_cb("orders", old, oid)
+            self.update_suggestions()
+
+    def update_suggestions(self):
+        self.suggestions_row.controls.clear()
+        oid = self.selected_order
+        suggestions = None
+        # Another session may change or delete the order meanwhile
+        with self.backend.lock:
+            orders = self.backend.table("orders")
+            if oid is not None and oid in orders:
+                # Only unmatched orders with a target weight need a turkey
+                if pd.isna(orders.get(oid, "assigned_tid")) and orders.get(oid, "target_weight"):
+                    suggestions = self.backend.suggest_turkeys(oid)
+        if suggestions is not None:
+            self.suggestions_row.controls.append(
+                ft.Text("Closest turkeys:" if suggestions else "No free turkeys.")
+            )
+            for s in suggestions:
+                self.suggestions_row.controls.append(
+                    ft.TextButton(
+                        f"#{s['tid']} ({s['weight']} lbs)",
+                        on_click=lambda e, tid=s["tid"]: self.select_turkey(tid)
+                    )
+                )
+        self.suggestions_row.update()
+
+    def update_stats(self):
+        if self.stats_overlay.visible:
+            self.stats_text.value = metrics.summary()
+            self.stats_overlay.update()
+
+    def update_dashboard(self):
+        try:
+            bin_width = float(self.bin_width_input.value or 1)
+            stats = self.backend.dashboard(bin_width)
+        except ValueError as ve:
+            log.warning("Invalid bin width: %s", ve)
+            return
+        text = dashboard_lines(stats, bin_width)
+        # Only send the panel when something in it changed
+        if text != self.dashboard_text.value:
+            self.dashboard_text.value = text
+            self.dashboard_text.update()
+
+    def update_undo_buttons(self):
+        undo, redo = self.backend.undo_labels()
+        self.undo_btn.text = f"Undo {undo}" if undo else "Undo"
+        self.undo_btn.disabled = undo is None
+        self.redo_btn.text = f"Redo {redo}" if redo else "Redo"
+        self.redo_btn.disabled = redo is None
+        self.undo_btn.update()
+        self.redo_btn.update()
+
+    def undo(self):
+        try:
+            self.backend.undo()
+        except ValueError as ve:
+            log.warning("%s", ve)
+        self.refresh()
+
+    def redo(self):
+        try:
+            self.backend.redo()
+        except ValueError as ve:
+            log.warning("%s", ve)
         self.refresh()
 
+    def search_changed(self):
+        # Debounced: a burst of keystrokes runs one search, after the last one
+        if self._search_timer is not None:
+            self._search_timer.cancel()
+        self._search_timer = threading.Timer(SEARCH_DELAY, self.refresh)
+        self._search_timer.daemon = True
+        self._search_timer.start()
+
+    def warm_search(self):
+        # Build the index while the user starts typing, not on the first keystroke
+        threading.Thread(target=self.backend.search_orders, args=("warm",), daemon=True).start()
+
+    def filter_orders(self, oids):
+        """
+        Keeps the order ids that match the search box, in the given order.
+        """
+        hits = self.backend.search_orders(self.search_input.value or "")
+        if hits is None:
+            return oids
+        return [oid for oid in oids if oid in hits]
+
+    def set_live_mode(self):
+        try:
+            tolerance = float(self.tolerance_input.value or DEFAULT_TOLERANCE)
+        except ValueError:
+            log.warning("Invalid tolerance!")
+            return
+        self.backend.set_live_mode(self.live_checkbox.value, self.swaps_checkbox.value, tolerance)
+        self.live_status.value = ""
+        self.live_status.update()
+
     def add_turkey_from_inputs(self):
         try:
             tid = int(self.tid_input.value)
             weight = float(self.weight_input.value)
         except ValueError:
-            print("Invalid turkey input!")
+            log.warning("Invalid turkey input!")
+            return
+        try:
+            oid = self.backend.add_turkey(tid, weight)
+        except ValueError as ve:
+            log.warning("%s", ve)
             return
-        self.backend.add_turkey(tid, weight)
+        if self.backend.live_match:
+            self.live_status.value = f"Turkey {tid} → Order {oid}" if oid is not None else f"Turkey {tid}: no waiting order fits"
+            self.live_status.update()
         self.tid_input.value = str(tid + 1)
         self.weight_input.value = ""
         self.tid_input.update()
@@ -125,7 +392,7 @@ class TurkeyManager:
             notes = self.notes_input.value
             ham = self.ham_radio_group.value
         except ValueError:
-            print("Invalid order input!")
+            log.warning("Invalid order input!")
             return
         self.backend.add_order(oid, target_weight, name, ham, notes)
         self.oid_input.value = str(oid + 1)
@@ -157,7 +424,7 @@ class TurkeyManager:
             try:
                 self.backend.match(self.selected_order, self.selected_turkey)
             except ValueError as ve:
-                print(ve)
+                log.warning("%s", ve)
             self.refresh()
 
     def unmatch_selected_turkey(self):
@@ -170,17 +437,119 @@ class TurkeyManager:
             self.backend.remove_match_by_oid(self.selected_order)
             self.refresh()
 
+    def constrain_selected_order(self):
+        if self.selected_order is None:
+            return
+        try:
+            # Empty fields clear the setting
+            min_weight = float(self.min_weight_input.value) if self.min_weight_input.value.strip() else None
+            max_weight = float(self.max_weight_input.value) if self.max_weight_input.value.strip() else None
+            priority = int(self.priority_input.value) if self.priority_input.value.strip() else None
+            self.backend.constrain_order(self.selected_order, min_weight, max_weight, priority)
+        except ValueError as ve:
+            log.warning("%s", ve)
+            return
+        self.refresh()
+
     def auto_match(self):
         try:
-            self.backend.auto_match()
+            tolerance = float(self.tolerance_input.value or DEFAULT_TOLERANCE)
+            score = self.backend.auto_match(self.match_strategy_dropdown.value, tolerance)
         except ValueError as ve:
-            print(ve)
+            log.warning("%s", ve)
+        else:
+            self.show_score(score)
         self.refresh()
 
+    def show_score(self, score):
+        # The run's quality, then why orders were left without a turkey (constrained only)
+        lines = [
+            f"Matched {score['matched']} orders: total deviation {score['total_deviation']:.2f} lbs, "
+            f"max {score['max_deviation']:.2f} lbs"
+        ]
+        unmatched = score.get("unmatched", {})
+        lines += [f"Order {oid}: {why}" for oid, why in list(unmatched.items())[:5]]
+        if len(unmatched) > 5:
+            lines.append(f"... and {len(unmatched) - 5} more unmatched")
+        self.match_status.value = "\n".join(lines)
+        self.match_status.update()
+
+    def import_file_picked(self, e):
+        if not e.files:
+            return
+        path = e.files[0].path
+        if path is None:
+            self.import_status.value = "Import needs a local file (desktop app)."
+            self.import_status.update()
+            return
+        self.import_btn.disabled = True
+        self.import_status.value = "Importing…"
+        self.import_btn.update()
+        self.import_status.update()
+        # Large files take a while; keep the UI responsive
+        threading.Thread(target=self.import_csv, args=(path,), daemon=True).start()
+
+    def import_csv(self, path):
+        try:
+            report = self.backend.import_csv(path)
+            self.import_status.value = f"Imported {report.added} {report.kind}, rejected {report.rejected} rows."
+        except (ValueError, OSError) as ve:
+            log.warning("%s", ve)
+            self.import_status.value = str(ve)
+        finally:
+            # Whatever happened, the next import must be possible
+            self.import_btn.disabled = False
+            self.import_btn.update()
+            self.import_status.update()
+            self.refresh()
+
     def make_pdf(self):
-        self.backend.export_turkey_orders_pdf()
-        self.backend.export_ham_orders_without_turkey()
-        self.backend.export_free_turkeys_pdf()
+        # Snapshot now, so edits made while the reports build do not leak into them
+        jobs, hits = self.backend.report_jobs()
+        if not jobs:
+            self.make_pdfs_btn.text = "Generate PDFs (all up to date)"
+            self.make_pdfs_btn.update()
+            return
+        self.make_pdfs_btn.disabled = True
+        self.make_pdfs_btn.text = f"Generating 0/{len(jobs)}…"
+        self.make_pdfs_btn.update()
+        threading.Thread(target=self.render_pdfs, args=(jobs, len(hits)), daemon=True).start()
+
+    def render_pdfs(self, jobs, unchanged):
+        def progress(done, total, filename):
+            self.make_pdfs_btn.text = f"Generating {done}/{total}…"
+            self.make_pdfs_btn.update()
+
+        text = "Generate PDFs (failed)"
+        try:
+            self.backend.render_reports(jobs, progress)
+            text = f"Generate PDFs ({len(jobs)} re-rendered, {unchanged} up to date)"
+        except (ValueError, OSError) as ve:
+            log.warning("%s", ve)
+        finally:
+            # Also after an unexpected error (e.g. from fpdf), which still propagates
+            self.make_pdfs_btn.text = text
+            self.make_pdfs_btn.disabled = False
+            self.make_pdfs_btn.update()
+
+    def make_tickets(self):
+        self.tickets_btn.disabled = True
+        self.tickets_btn.text = "Printing tickets…"
+        self.tickets_btn.update()
+        threading.Thread(target=self.render_tickets, daemon=True).start()
+
+    def render_tickets(self):
+        text = "Pickup Tickets (failed)"
+        try:
+            filename = self.backend.export_pickup_tickets(order_by="name")
+            text = "Pickup Tickets (saved)" if filename else "Pickup Tickets (no orders)"
+        except (ValueError, OSError) as ve:
+            log.warning("%s", ve)
+        finally:
+            self.tickets_btn.text = text
+            self.tickets_btn.disabled = False
+            self.tickets_btn.update()
+
     # --- Sorting ---
     def cycle_turkey_sort(self):
         self.turkey_sort_index = (self.turkey_sort_index + 1) % len(self.turkey_sort_modes)
@@ -191,24 +560,55 @@ class TurkeyManager:
         self.refresh()
 
     # --- Get sorted data ---
-    def get_sorted_turkeys(self):
-        df = self.backend.turkeys.copy()
-        mode = self.turkey_sort_modes[self.turkey_sort_index]
-        if mode == "tid_asc": df = df.sort_values("tid")
-        elif mode == "tid_desc": df = df.sort_values("tid", ascending=False)
-        elif mode == "weight_asc": df = df.sort_values("weight")
-        elif mode == "weight_desc": df = df.sort_values("weight", ascending=False)
-        elif mode == "unassigned_weight_asc": df = df[df["assigned"] == False].sort_values("weight")
-        elif mode == "unassigned_weight_desc": df = df[df["assigned"] == False].sort_values("weight", ascending=False)
-        return df
-
-    def get_sorted_orders(self):
-        df = self.backend.orders.copy()
-        mode = self.order_sort_modes[self.order_sort_index]
-        if mode == "oid_asc": df = df.sort_values("oid")
-        elif mode == "oid_desc": df = df.sort_values("oid", ascending=False)
-        elif mode == "target_weight_asc": df = df.sort_values("target_weight")
-        elif mode == "target_weight_desc": df = df.sort_values("target_weight", ascending=False)
-        elif mode == "unassigned_weight_asc": df = df[df["assigned_tid"].isna()].sort_values("target_weight")
-        elif mode == "unassigned_weight_desc": df = df[df["assigned_tid"].isna()].sort_values("target_weight", ascending=False)
-        return df
+    def sorted_turkey_ids(self, column=None, ascending=None):
+        """
+        Turkey ids in display order, from a cached and incrementally updated sort.
+
+        Args:
+            column (str): sort column; defaults to the current sort mode's.
+            ascending (bool): sort direction; defaults to the sort mode's.
+        """
+        mode_column, mode_ascending, unassigned_only = TURKEY_SORTS[self.turkey_sort_modes[self.turkey_sort_index]]
+        return self._sorted_ids(
+            "turkeys",
+            column or mode_column,
+            mode_ascending if ascending is None else ascending,
+            unassigned_turkeys if unassigned_only else None,
+        )
+
+    def sorted_order_ids(self, column=None, ascending=None):
+        """
+        Order ids in display order, from a cached and incrementally updated sort.
+
+        Args:
+            column (str): sort column; defaults to the current sort mode's.
+            ascending (bool): sort direction; defaults to the sort mode's.
+        """
+        mode_column, mode_ascending, unassigned_only = ORDER_SORTS[self.order_sort_modes[self.order_sort_index]]
+        return self._sorted_ids(
+            "orders",
+            column or mode_column,
+            mode_ascending if ascending is None else ascending,
+            unassigned_orders if unassigned_only else None,
+        )
+
+    def _sorted_ids(self, table_name, column, ascending, keep):
+        view = self._sorted_views.get((table_name, column, keep))
+        if view is None:
+            view = self._sorted_views[(table_name, column, keep)] = SortedView(column, keep)
+        # Table, version and change log must agree, whichever session is editing
+        with self.backend.lock:
+            changes = None
+            if view.version is not None:
+                changed = self.backend.changes_since(view.version)
+                if changed is not None:
+                    changes = [key for changed_table, key in changed if changed_table == table_name]
+            return view.ids(self.backend.table(table_name), self.backend.version, changes, ascending)
+
+    def get_sorted_turkeys(self, column=None, ascending=None):
+        with self.backend.lock:
+            return self.backend.turkeys.loc[self.sorted_turkey_ids(column, ascending)]
+
+    def get_sorted_orders(self, column=None, ascending=None):
+        with self.backend.lock:
+            return self.backend.orders.loc[self.sorted_order_ids(column, ascending)]
@@ -0,0 +1,109 @@
+import bisect
+import math
+from collections import Counter
+
+
+class WeightIndex:
+    """
+    Ids kept sorted by weight so nearest-weight questions are a bisect away.
+
+    Inserts and removals are a bisect plus a list shift; nearest() is O(log n + k).
+    A running count per distinct weight backs histogram() without a scan.
+    """
+
+    def __init__(self):
+        self._entries = []  # sorted (weight, id)
+        self._weights = {}  # id -> weight, to find an entry again on removal
+        self._counts = Counter()  # weight -> ids at that weight
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._weights
+
+    def add(self, key, weight):
+        if key in self._weights:
+            raise ValueError(f"{key} is already in the weight index!")
+        weight = float(weight)
+        self._weights[key] = weight
+        self._counts[weight] += 1
+        bisect.insort(self._entries, (weight, key))
+
+    def add_many(self, items):
+        items = [(key, float(weight)) for key, weight in items]
+        if len(items) * 8 < len(self._entries):
+            # Few additions: bisect each one in
+            for key, weight in items:
+                self.add(key, weight)
+            return
+        # Many additions: one sort is cheaper than many list shifts
+        for key, weight in items:
+            if key in self._weights:
+                raise ValueError(f"{key} is already in the weight index!")
+        for key, weight in items:
+            self._weights[key] = weight
+        self._counts.update(weight for _, weight in items)
+        self._entries.extend((weight, key) for key, weight in items)
+        self._entries.sort()
+
+    def remove(self, key):
+        weight = self._weights.pop(key)
+        self._uncount(weight)
+        pos = bisect.bisect_left(self._entries, (weight, key))
+        del self._entries[pos]
+
+    def remove_many(self, keys):
+        keys = set(keys)
+        if len(keys) * 8 < len(self._entries):
+            # Few removals: bisect each one out
+            for key in keys:
+                self.remove(key)
+            return
+        # Many removals: one filtering pass is cheaper than many list shifts
+        for key in keys:
+            self._uncount(self._weights.pop(key))
+        self._entries = [entry for entry in self._entries if entry[1] not in keys]
+
+    def _uncount(self, weight):
+        self._counts[weight] -= 1
+        if not self._counts[weight]:
+            del self._counts[weight]
+
+    def histogram(self, bin_width=1.0):
+        """
+        Counts per weight bin, from the running counts: O(distinct weights).
+
+        Returns:
+            dict: bin start (a multiple of bin_width) -> count, non-empty bins only.
+        """
+        bins = Counter()
+        for weight, count in self._counts.items():
+            bins[math.floor(weight / bin_width) * bin_width] += count
+        return dict(bins)
+
+    def weight(self, key):
+        return self._weights[key]
+
+    def discard(self, key):
+        if key in self._weights:
+            self.remove(key)
+
+    def nearest(self, weight, k=1):
+        """
+        Returns up to k (id, weight) pairs, closest to `weight` first.
+        """
+        weight = float(weight)
+        entries = self._entries
+        hi = bisect.bisect_left(entries, (weight,))
+        lo = hi - 1
+        found = []
+        while len(found) < k and (lo >= 0 or hi < len(entries)):
+            # Take whichever neighbour is closer; ties go to the lighter bird
+            if hi >= len(entries) or (lo >= 0 and weight - entries[lo][0] <= entries[hi][0] - weight):
+                found.append((entries[lo][1], entries[lo][0]))
+                lo -= 1
+            else:
+                found.append((entries[hi][1], entries[hi][0]))
+                hi += 1
+        return found
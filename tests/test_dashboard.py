@@ -0,0 +1,57 @@
+import math
+import random
+from collections import Counter
+
+import pytest
+
+from backend import Backend
+
+
+def histogram(weights, bin_width):
+    return dict(Counter(math.floor(weight / bin_width) * bin_width for weight in weights))
+
+
+def expected(backend, bin_width):
+    # The same numbers counted from the tables
+    orders, turkeys = backend.orders, backend.turkeys
+    matched = orders["assigned_tid"].notna()
+    free = turkeys[~turkeys["assigned"]]
+    waiting = orders[~matched & (orders["target_weight"] != 0)]
+    return {
+        "free_turkeys": histogram(free["weight"], bin_width),
+        "waiting_orders": histogram(waiting["target_weight"], bin_width),
+        "ham": dict(Counter(orders["ham"])),
+        "orders": len(orders),
+        "matched": int(matched.sum()),
+        "unmatched": int((~matched).sum()),
+        "turkeys": len(turkeys),
+        "free_turkeys_total": len(free),
+    }
+
+
+def test_running_counts_match_the_tables():
+    rng = random.Random(0)
+    backend = Backend()
+    backend.add_orders([
+        (oid, rng.choice([0.0, 12.5, 14.0, 15.5, 18.0]), f"name {oid}", rng.choice(["None", "Half", "Whole"]), "")
+        for oid in range(1, 60)
+    ])
+    backend.add_turkeys([(tid, round(rng.uniform(10, 22), 1)) for tid in range(1, 50)])
+    backend.auto_match("greedy")
+    steps = [
+        lambda: backend.remove_match_by_oid(next(iter(backend.orders["assigned_tid"].dropna().index))),
+        lambda: backend.remove_turkey(int(backend.turkeys.index[0])),
+        lambda: backend.remove_orders(backend.orders.index[:5].tolist()),
+        lambda: backend.add_turkey(100, 16.0),
+        lambda: backend.add_order(100, 16.0, "Zed", "Half", ""),
+        lambda: backend.match(100, 100),
+        lambda: backend.undo(),
+        lambda: backend.undo(),
+    ]
+    for step in steps:
+        step()
+        for bin_width in (1.0, 2.5):
+            assert backend.dashboard(bin_width) == expected(backend, bin_width)
+
+    with pytest.raises(ValueError, match="positive"):
+        backend.dashboard(0)
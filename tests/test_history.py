@@ -0,0 +1,88 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from backend import Backend
+
+
+def state(backend):
+    # Values with their types, so an undo that turns a tid into a float does
+    # not pass. An undone match leaves the order unmatched, which reads NA
+    # where a never matched one reads NaN; an undone delete adds the row
+    # back at the end.
+    return [
+        [
+            "missing" if pd.isna(value) else (type(value), str(value))
+            for row in df.sort_index().itertuples() for value in row
+        ]
+        for df in (backend.orders, backend.turkeys)
+    ]
+
+
+def test_undo_and_redo_are_exact_inverses():
+    backend = Backend()
+    steps = [
+        lambda: backend.add_orders([(oid, 12.0 + oid, f"name {oid}", "None", "") for oid in range(1, 8)]),
+        lambda: backend.add_turkeys([(tid, 12.5 + tid) for tid in range(1, 8)]),
+        lambda: backend.add_order(8, 0.0, "Dee", "Half", "!early"),
+        lambda: backend.match(1, 3),
+        lambda: backend.auto_match("min_total"),
+        lambda: backend.remove_match_by_tid(3),
+        lambda: backend.remove_turkey(5),
+        lambda: backend.remove_orders([2, 8]),
+        lambda: backend.unmatch_many([4, 6]),
+        lambda: backend.add_turkey(9, 14.0),
+    ]
+    states = [state(backend)]
+    for step in steps:
+        step()
+        states.append(state(backend))
+
+    for expected in reversed(states[:-1]):
+        backend.undo()
+        assert state(backend) == expected
+    with pytest.raises(ValueError, match="Nothing to undo"):
+        backend.undo()
+    for expected in states[1:]:
+        backend.redo()
+        assert state(backend) == expected
+    assert backend.undo_labels() == ("Add turkey", None)
+
+
+def test_sessions_undo_only_their_own_commands():
+    backend = Backend()
+    ann, bob = backend.session("ann"), backend.session("bob")
+    ann.add_turkey(1, 15.0)
+    bob.add_turkey(2, 16.0)
+    ann.add_order(1, 15.0, "Ann", "None", "")
+
+    assert bob.undo_labels() == ("Add turkey", None)
+    assert bob.undo() == "Add turkey"
+    assert backend.turkeys.index.tolist() == [1]
+    assert backend.orders.index.tolist() == [1]
+    with pytest.raises(ValueError, match="Nothing to undo"):
+        bob.undo()
+
+    # Ann's history is untouched by Bob's undo
+    assert ann.undo_labels() == ("Add order", None)
+    ann.undo()
+    ann.undo()
+    assert backend.turkeys.empty and backend.orders.empty
+    bob.redo()
+    assert backend.turkeys.index.tolist() == [2]
+
+    backend.end_session("ann")
+    assert ann.undo_labels() == (None, None)
+
+
+def test_replaying_in_one_thread_does_not_hide_another_threads_commands():
+    backend = Backend()
+    bob = backend.session("bob")
+    with backend._history.replaying():
+        backend.add_turkey(1, 15.0)
+        thread = threading.Thread(target=lambda: bob.add_turkey(2, 16.0))
+        thread.start()
+        thread.join()
+    assert backend.undo_labels() == (None, None)
+    assert bob.undo_labels() == ("Add turkey", None)
@@ -0,0 +1,26 @@
+from backend import Backend
+
+
+def write(tmp_path, text):
+    path = tmp_path / "import.csv"
+    path.write_text(text)
+    return str(path)
+
+
+def test_header_only_file(tmp_path):
+    report = Backend().import_csv(write(tmp_path, "tid,weight\n"))
+    assert (report.added, report.rejected) == (0, 0)
+
+
+def test_line_numbers_count_blank_and_wrapped_lines(tmp_path):
+    text = (
+        "oid,target_weight,name,ham,notes\n"  # line 1
+        "1,12,Ann,None,\"two\nlines\"\n"      # lines 2-3
+        "\n"                                  # line 4
+        "2,x,Bob,None,\n"                     # line 5
+        "3,14,Cy,Half,\n"                     # line 6
+        "\n"
+    )
+    report = Backend().import_csv(write(tmp_path, text), chunksize=2)
+    assert report.added == 1
+    assert [line for line, _ in report.errors] == [5, 6]
@@ -0,0 +1,14 @@
+import pytest
+
+from backend import Backend
+
+
+def test_season_directory_opens_once(tmp_path):
+    first = Backend(csv=str(tmp_path))
+    first.add_turkey(1, 15.0)
+    with pytest.raises(ValueError, match="already open"):
+        Backend(csv=str(tmp_path))
+
+    first._journal.close()
+    second = Backend(csv=str(tmp_path))
+    assert second.turkeys.index.tolist() == [1]
@@ -0,0 +1,17 @@
+from backend import Backend
+
+
+def test_live_arrival_is_matched_without_flushing():
+    backend = Backend()
+    backend.add_orders([(1, 15.0, "Ann", "None", ""), (2, 20.0, "Bob", "None", "")])
+    backend.add_turkey(1, 19.5)
+    backend.turkeys  # flush, so the next bird is the only buffered one
+    backend.set_live_mode(True)
+
+    assert backend.add_turkey(2, 15.5) == 1
+    turkeys = backend.table("turkeys")
+    assert len(turkeys._frame) == 1 and turkeys.get(2, "assigned")
+
+    assert backend.orders.at[1, "assigned_tid"] == 2
+    assert backend.orders.at[1, "assigned_weight"] == 15.5
+    assert backend.turkeys.at[2, "assigned"]
@@ -0,0 +1,41 @@
+import pandas as pd
+import pytest
+
+from backend import Backend
+
+
+def season():
+    backend = Backend()
+    backend.add_orders([(oid, 10.0 + oid, f"name {oid}", "None", "") for oid in range(1, 6)])
+    backend.add_turkeys([(tid, 10.5 + tid) for tid in range(1, 6)])
+    return backend
+
+
+def test_same_tables_as_matching_one_by_one():
+    batched, single = season(), season()
+    pairs = [(1, 2), (3, 5), (4, 1)]
+    assert batched.match_many(pairs) == 3
+    for oid, tid in pairs:
+        single.match(oid, tid)
+    pd.testing.assert_frame_equal(batched.orders, single.orders)
+    pd.testing.assert_frame_equal(batched.turkeys, single.turkeys)
+
+
+@pytest.mark.parametrize("pairs", [
+    [(1, 1), (2, 1)],    # a turkey twice
+    [(1, 1), (1, 2)],    # an order twice
+    [(1, 1), (2, 99)],   # a missing turkey
+    [(1, 1), (99, 2)],   # a missing order
+    [(1, 1), (2, 3)],    # a turkey that is taken
+    [(1, 1), (5, 4)],    # an order that has one
+])
+def test_bad_pair_writes_nothing(pairs):
+    backend = season()
+    backend.match(5, 3)
+    orders, turkeys = backend.orders.copy(), backend.turkeys.copy()
+    with pytest.raises(ValueError):
+        backend.match_many(pairs)
+    pd.testing.assert_frame_equal(backend.orders, orders)
+    pd.testing.assert_frame_equal(backend.turkeys, turkeys)
+    # The good pair in the batch is still free to match
+    assert backend.match_many([(1, 1)]) == 1
@@ -0,0 +1,86 @@
+import itertools
+import random
+
+import pytest
+
+from matching import constrained_pairs, optimal_pairs
+
+
+def assignments(n, m):
+    # Every way to give n orders distinct turkeys out of m, -1 for none
+    for assign in itertools.product(range(-1, m), repeat=n):
+        used = [a for a in assign if a >= 0]
+        if len(set(used)) == len(used):
+            yield assign
+
+
+@pytest.mark.parametrize("strategy", ["min_total", "min_max"])
+def test_optimal_pairs_against_brute_force(strategy):
+    rng = random.Random(0)
+    for _ in range(300):
+        orders = [rng.randint(8, 20) + rng.choice([0, 0.5]) for _ in range(rng.randint(0, 5))]
+        turkeys = [rng.randint(8, 20) + rng.choice([0, 0.5]) for _ in range(rng.randint(0, 5))]
+        order_idx, turkey_idx = optimal_pairs(orders, turkeys, strategy)
+
+        size = min(len(orders), len(turkeys))
+        assert len(order_idx) == size
+        assert len(set(order_idx.tolist())) == len(set(turkey_idx.tolist())) == size
+        deviations = [abs(orders[i] - turkeys[j]) for i, j in zip(order_idx, turkey_idx)]
+        best = None
+        for assign in assignments(len(orders), len(turkeys)):
+            if sum(a >= 0 for a in assign) != size:
+                continue
+            cost = [abs(orders[i] - turkeys[a]) for i, a in enumerate(assign) if a >= 0]
+            cost = sum(cost) if strategy == "min_total" else max(cost, default=0)
+            best = cost if best is None else min(best, cost)
+        got = sum(deviations) if strategy == "min_total" else max(deviations, default=0)
+        assert got == pytest.approx(best or 0), (orders, turkeys)
+
+
+def best_tier_counts(lows, highs, tiers, weights):
+    # The most orders each tier can get, lowest tier first
+    best = None
+    for assign in assignments(len(lows), len(weights)):
+        if any(a >= 0 and not lows[i] <= weights[a] <= highs[i] for i, a in enumerate(assign)):
+            continue
+        counts = tuple(sum(a >= 0 and tiers[i] == tier for i, a in enumerate(assign)) for tier in sorted(set(tiers)))
+        best = counts if best is None else max(best, counts)
+    return best
+
+
+def test_constrained_pairs_moves_earlier_orders_to_make_room():
+    order_idx, turkey_idx, unmatched = constrained_pairs(
+        [8, 13, 11], [13, 19, 11], [1, 0, 1], [13, 14, 14, 22, 25, 21]
+    )
+    assert sorted(order_idx.tolist()) == [0, 1]
+    assert unmatched == [(2, "no turkey between 11 and 11 lbs")]
+
+
+def test_constrained_pairs_against_brute_force():
+    rng = random.Random(1)
+    for _ in range(500):
+        n, m = rng.randint(1, 5), rng.randint(0, 5)
+        lows = [rng.randint(0, 8) for _ in range(n)]
+        highs = [low + rng.randint(-1, 4) for low in lows]
+        tiers = [rng.randint(0, 2) for _ in range(n)]
+        weights = [rng.randint(0, 10) for _ in range(m)]
+        case = (lows, highs, tiers, weights)
+        order_idx, turkey_idx, unmatched = constrained_pairs(*case)
+
+        assert len(set(turkey_idx.tolist())) == len(turkey_idx), case
+        assert all(lows[i] <= weights[j] <= highs[i] for i, j in zip(order_idx, turkey_idx)), case
+        assert sorted(order_idx.tolist() + [i for i, _ in unmatched]) == list(range(n)), case
+        counts = tuple(sum(tiers[i] == tier for i in order_idx) for tier in sorted(set(tiers)))
+        assert counts == best_tier_counts(*case), case
+
+        # Blamed on higher priorities exactly when the earlier tiers' orders
+        # leave the order no room, however they are rearranged
+        for i, why in unmatched:
+            rivals = [k for k in order_idx.tolist() if tiers[k] < tiers[i]] + [i]
+            fits = best_tier_counts(
+                [lows[k] for k in rivals], [highs[k] for k in rivals], [0] * len(rivals), weights
+            ) == (len(rivals),)
+            if "higher-priority" in why:
+                assert not fits, (case, i, why)
+            elif "same priority" in why:
+                assert fits, (case, i, why)
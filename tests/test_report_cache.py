@@ -0,0 +1,54 @@
+import logging
+import os
+
+from backend import Backend
+
+
+def season():
+    backend = Backend()
+    backend.add_orders([(1, 15.0, "Ann", "None", ""), (2, 18.0, "Bob", "Half", "")])
+    backend.add_turkeys([(1, 15.5), (2, 18.5)])
+    return backend
+
+
+def rendered(caplog, export, filename):
+    caplog.clear()
+    with caplog.at_level(logging.INFO, logger="turkeys"):
+        assert export(filename) == filename
+    return "is up to date" not in caplog.text
+
+
+def test_report_is_rendered_again_only_when_its_rows_change(tmp_path, caplog):
+    backend = season()
+    filename = str(tmp_path / "free.pdf")
+    assert rendered(caplog, backend.export_free_turkeys_pdf, filename)
+    assert not rendered(caplog, backend.export_free_turkeys_pdf, filename)
+
+    # Orders are not in this report
+    backend.add_order(3, 20.0, "Cy", "None", "")
+    assert not rendered(caplog, backend.export_free_turkeys_pdf, filename)
+
+    backend.match(1, 1)
+    assert rendered(caplog, backend.export_free_turkeys_pdf, filename)
+    # The file is rendered again when it is gone from disk
+    os.remove(filename)
+    assert rendered(caplog, backend.export_free_turkeys_pdf, filename)
+    assert os.path.exists(filename)
+
+
+def test_report_jobs_leave_out_unchanged_reports(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    backend = season()
+    backend.export_turkey_orders_pdf()
+    backend.export_free_turkeys_pdf()
+    backend.export_ham_orders_without_turkey()
+    jobs, hits = backend.report_jobs()
+    assert (jobs, sorted(hits)) == ([], ["free_turkeys", "ham_orders", "orders"])
+
+    backend.match(2, 2)
+    jobs, hits = backend.report_jobs()
+    assert sorted(name for name, *_ in jobs) == ["free_turkeys", "ham_orders", "orders"]
+    backend.remove_match_by_oid(2)
+    jobs, hits = backend.report_jobs()
+    # Back to the rows the files were rendered from
+    assert jobs == []
@@ -0,0 +1,71 @@
+import random
+
+import pandas as pd
+import pytest
+
+from backend import Backend
+
+NAMES = ["Ann Lee", "Bob Ünal", "Cyrus Annan", "Dee", "Eve O'Neil", "Lee Ann"]
+NOTES = ["", "call first", "!early pickup", "half ham", "Annex door"]
+QUERIES = ["ann", "an", "lee ann", "a", "1", "12", "call", "ü", "pickup early", "zzz", "ne", "o'n"]
+
+
+def expected(orders, query):
+    # Every word in the order: anywhere if 3+ characters, else at a word start
+    hits = set()
+    for oid, name, notes in zip(orders.index, orders["name"], orders["notes"]):
+        text = f"{oid}\n{name}\n{notes}".lower()
+        if all(
+            term in text if len(term) >= 3 else any(word.startswith(term) for word in text.split())
+            for term in query.lower().split()
+        ):
+            hits.add(oid)
+    return hits
+
+
+def test_incremental_updates_match_a_fresh_scan(monkeypatch):
+    rng = random.Random(0)
+    backend = Backend()
+    backend.add_orders([(oid, 15.0, rng.choice(NAMES), "None", rng.choice(NOTES)) for oid in range(1, 200)])
+    backend.add_turkeys([(tid, 15.0) for tid in range(1, 50)])
+    assert backend.search_orders("ann") == expected(backend.orders, "ann")
+
+    index = backend._search
+    rebuilds = []
+    monkeypatch.setattr(index, "_rebuild", lambda orders: rebuilds.append(len(orders)))
+    next_oid = 200
+    for _ in range(60):
+        action = rng.randrange(4)
+        if action == 0:
+            backend.add_order(next_oid, 15.0, rng.choice(NAMES), "None", rng.choice(NOTES))
+            next_oid += 1
+        elif action == 1:
+            backend.remove_order(rng.choice(backend.orders.index.tolist()))
+        elif action == 2:
+            backend.undo()
+        else:
+            oid = rng.choice(backend.orders.index.tolist())
+            if pd.isna(backend.orders.at[oid, "assigned_tid"]) and not backend.turkeys["assigned"].all():
+                backend.match(oid, int(backend.turkeys.index[~backend.turkeys["assigned"]][0]))
+        query = rng.choice(QUERIES)
+        assert backend.search_orders(query) == expected(backend.orders, query), query
+        assert index._words == sorted(index._words)
+    # Small edits never re-index the whole table
+    assert rebuilds == []
+    assert backend.search_orders("  ") is None
+
+
+
+def test_batch_of_changes_is_merged_without_a_rebuild(monkeypatch):
+    rng = random.Random(1)
+    backend = Backend()
+    backend.add_orders([(oid, 15.0, rng.choice(NAMES), "None", rng.choice(NOTES)) for oid in range(1, 1000)])
+    backend.search_orders("ann")
+
+    index = backend._search
+    monkeypatch.setattr(index, "_rebuild", lambda orders: pytest.fail("rebuilt"))
+    backend.remove_orders(list(range(1, 60)))
+    backend.add_orders([(oid, 15.0, rng.choice(NAMES), "None", rng.choice(NOTES)) for oid in range(1000, 1060)])
+    for query in QUERIES:
+        assert backend.search_orders(query) == expected(backend.orders, query), query
+    assert index._words == sorted(index._words)
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+from backend import Backend
+from snapshot import load_tables
+
+
+def season():
+    backend = Backend()
+    backend.add_orders([
+        (1, 15.0, "Ann", "None", ""),
+        (2, 18.5, "Bob Ünal", "Half", "call first"),
+        (3, 0.0, "Cy", "Whole", ""),
+    ])
+    backend.add_turkeys([(1, 15.5), (2, 18.0), (3, 21.0)])
+    backend.match(1, 1)
+    backend.match(2, 2)
+    backend.remove_match_by_oid(2)  # unmatched reads NA, never matched reads NaN
+    backend.constrain_order(3, 20.0, None, 1)
+    return backend
+
+
+def cells(df):
+    # Values with their types, so NaN, NA and int vs float tids count
+    return [(type(value), str(value)) for row in df.itertuples() for value in row]
+
+
+def test_round_trip(tmp_path):
+    backend = season()
+    backend.save_snapshot(str(tmp_path / "snap"))
+    loaded = Backend()
+    loaded.load_snapshot(str(tmp_path / "snap"))
+
+    for name in ("orders", "turkeys"):
+        before, after = getattr(backend, name), getattr(loaded, name)
+        pd.testing.assert_frame_equal(after, before)
+        assert cells(after) == cells(before)
+    assert loaded.constraints(3) == (20.0, None, 1)
+    assert loaded.constraints(1) == (None, None, None)
+    # The indexes are rebuilt too
+    assert loaded.nearest_free_turkeys(20.0) == backend.nearest_free_turkeys(20.0)
+    loaded.match(3, 3)
+    assert loaded.orders.at[3, "assigned_tid"] == 3
+
+
+def test_numeric_columns_are_memory_mapped(tmp_path):
+    season().save_snapshot(str(tmp_path / "snap"))
+    tables, _ = load_tables(str(tmp_path / "snap"), ["turkeys", "missing"])
+    assert set(tables) == {"turkeys"}
+    values = tables["turkeys"]["weight"].to_numpy()
+    while not isinstance(values, np.memmap) and values.base is not None:
+        values = values.base
+    assert isinstance(values, np.memmap)
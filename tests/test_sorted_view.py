@@ -0,0 +1,43 @@
+from backend import Backend
+from sorted_view import SortedView
+from turkey_manager import TurkeyManager
+
+
+def test_incremental_sort_by_index():
+    # Sorting by tid/oid once read the index name from a slice, which drops it
+    backend = Backend()
+    backend.add_turkey(1, 15.0)
+    view = SortedView("tid")
+    assert view.ids(backend.table("turkeys"), backend.version, None) == [1]
+    version = view.version
+    backend.add_turkey(2, 16.0)
+    changes = [key for _, key in backend.changes_since(version)]
+    assert view.ids(backend.table("turkeys"), backend.version, changes) == [1, 2]
+
+
+def test_incremental_sort_matches_full_sort():
+    backend = Backend()
+    manager = TurkeyManager(backend, lambda: None)
+    for column in ("tid", "weight"):
+        manager.sorted_turkey_ids(column, True)
+    for column in ("oid", "name"):
+        manager.sorted_order_ids(column, True)
+
+    backend.add_turkeys([(tid, 10.0 + tid % 7) for tid in range(1, 200)])
+    backend.add_orders([(oid, 12.0, f"name {oid % 13}", False, "") for oid in range(1, 200)])
+    for column in ("tid", "weight"):
+        manager.sorted_turkey_ids(column, True)
+    for column in ("oid", "name"):
+        manager.sorted_order_ids(column, True)
+    backend.match(5, 3)
+    backend.remove_turkey(7)
+    backend.add_turkey(500, 9.5)
+    backend.remove_order(11)
+
+    turkeys, orders = backend.turkeys, backend.orders
+    assert manager.sorted_turkey_ids("tid", True) == sorted(turkeys.index)
+    assert manager.sorted_order_ids("oid", False) == sorted(orders.index, reverse=True)
+    assert manager.sorted_turkey_ids("weight", True) == [
+        tid for _, tid in sorted(zip(turkeys["weight"], turkeys.index))]
+    assert manager.sorted_order_ids("name", True) == [
+        oid for _, oid in sorted(zip(orders["name"], orders.index))]
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+from backend import Backend
+from table_buffer import BufferedTable
+
+
+def turkeys(*rows):
+    return pd.DataFrame(rows, columns=["tid", "weight", "assigned"]).set_index("tid")
+
+
+def test_reads_and_writes_do_not_flush():
+    table = BufferedTable(turkeys((1, 15.0, False), (2, 16.0, False)))
+    table.append(3, {"weight": 12.0, "assigned": False})
+    table.set(3, "assigned", True)
+    table.set(1, "assigned", True)
+
+    rows = table.rows([3, 1])
+    assert rows.index.tolist() == [3, 1] and rows.index.name == "tid"
+    assert rows["assigned"].tolist() == [True, True]
+    assert table.get(3, "weight") == 12.0 and 3 in table and len(table) == 3
+    assert len(table._frame) == 2
+
+    frame = table.frame
+    assert frame.index.tolist() == [1, 2, 3]
+    assert frame["assigned"].tolist() == [True, False, True]
+
+
+def test_deletes_wait_for_the_next_full_read():
+    table = BufferedTable(turkeys((1, 15.0, False), (2, 16.0, False)))
+    table.append(3, {"weight": 12.0, "assigned": False})
+    table.delete(1)
+    table.delete(3)
+    assert 1 not in table and 3 not in table and len(table) == 1
+
+    # Undoing a delete adds the row back as a pending one
+    table.append(1, {"weight": 15.0, "assigned": True})
+    assert table.rows([2, 1])["assigned"].tolist() == [False, True]
+    assert table.frame.index.tolist() == [2, 1]
+    assert len(table) == 2
+
+
+def test_buffered_rows_read_like_stored_ones():
+    backend = Backend()
+    backend.add_orders([(1, 15.0, "Ann", "None", ""), (2, 16.0, "Bob", "Half", "")])
+    backend.add_turkeys([(1, 15.5), (2, 16.5)])
+    backend.orders  # flush, so what follows is buffered
+    backend.add_order(3, 17.0, "Cy", "None", "")
+    backend.add_turkey(3, 17.5)
+    backend.match(1, 1)
+    backend.match(3, 3)
+
+    turkeys = backend.table("turkeys")
+    assert type(turkeys.get(3, "weight")) is type(turkeys.get(1, "weight")) is np.float64
+    for frame in (backend.table("orders").rows([1, 2, 3]), backend.orders):
+        assert frame.columns.tolist() == ["name", "assigned_tid", "assigned_weight", "target_weight", "ham", "notes"]
+        assert frame.dtypes.tolist() == [object, object, object, float, object, object]
+        # As the original table read: tids stay ints, a never matched order reads NaN
+        assert [type(tid) for tid in frame["assigned_tid"]] == [int, float, int]
+        assert np.isnan(frame.at[2, "assigned_tid"])
+        assert [type(weight) for weight in frame["assigned_weight"]] == [np.float64, float, np.float64]
+    assert backend.turkeys.dtypes.tolist() == [float, bool]